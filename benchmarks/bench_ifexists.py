@@ -0,0 +1,70 @@
+"""
+{% ifexists %} inside a 10k row {% for %}, with the exception-free
+existence probe compared to detecting missing variables by catching
+FastDevVariableDoesNotExist.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ifexists
+"""
+import os
+import timeit
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.template import (  # noqa: E402
+    Context,
+    Template,
+)
+
+from django_fastdev.apps import FastDevVariableDoesNotExist  # noqa: E402
+from django_fastdev.templatetags.fastdev import IfExistsNode  # noqa: E402
+
+ROWS = 10_000
+
+
+def render_with_exceptions(self, context):
+    for condition, nodelist in self.conditions_nodelists:
+        if condition is not None:
+            try:
+                condition.eval(context)
+                match = True
+            except FastDevVariableDoesNotExist:
+                match = False
+        else:
+            match = True
+
+        if match:
+            return nodelist.render(context)
+
+    return ''
+
+
+def run(name, template, context):
+    elapsed = min(timeit.repeat(lambda: template.render(context), number=1, repeat=5))
+    print(f'{name:>12}: {elapsed * 1e3:8.1f} ms per render, {elapsed / ROWS * 1e9:8.0f} ns per row')
+    return elapsed
+
+
+def main():
+    template = Template('{% load fastdev %}{% for row in rows %}{% ifexists row.missing %}{{ row.missing }}{% elifexists row.name %}{{ row.name }}{% endifexists %}{% endfor %}')
+    context = Context({'rows': [{'name': str(i)} for i in range(ROWS)]})
+
+    probe = run('probe', template, context)
+
+    probe_render = IfExistsNode.render
+    IfExistsNode.render = render_with_exceptions
+    try:
+        exceptions = run('exceptions', template, context)
+    finally:
+        IfExistsNode.render = probe_render
+
+    print(f'{"speedup":>12}: {exceptions / probe:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Render throughput with FASTDEV_ENABLED = False compared to stock Django.
+
+With fastdev disabled no patches are installed, so the two numbers should
+be the same within noise. Run from the repository root:
+
+    python -m benchmarks.bench_off_mode
+"""
+import timeit
+
+import django
+from django.conf import settings
+from django.template.base import FilterExpression
+from django.template.defaulttags import IfNode
+
+stock = (FilterExpression.resolve, IfNode.render)
+
+settings.configure(
+    INSTALLED_APPS=['django_fastdev'],
+    TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+    FASTDEV_ENABLED=False,
+)
+django.setup()
+
+from django.template import (  # noqa: E402
+    Context,
+    Engine,
+)
+
+NUMBER = 200
+
+
+def main():
+    assert (FilterExpression.resolve, IfNode.render) == stock, 'django-fastdev patched Django with FASTDEV_ENABLED = False'
+
+    # A separate engine with the same source, so the comparison is between two identical templates
+    stock_template = Engine().from_string('{% for row in rows %}{% if row.a %}{{ row.a }}{{ row.b|upper }}{% endif %}{% endfor %}')
+    fastdev_template = Engine.get_default().from_string(stock_template.source)
+    context = Context({'rows': [{'a': i, 'b': 'b'} for i in range(100)]})
+
+    results = {}
+    for name, template in [('stock', stock_template), ('fastdev off', fastdev_template)] * 2:
+        elapsed = min(timeit.repeat(lambda: template.render(context), number=NUMBER, repeat=5))
+        results[name] = NUMBER / elapsed
+    for name, renders_per_second in results.items():
+        print(f'{name:>12}: {renders_per_second:8.0f} renders/s')
+    print(f'{"ratio":>12}: {results["fastdev off"] / results["stock"]:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Per-variable render cost of django-fastdev compared to stock Django.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_resolve
+"""
+import os
+import timeit
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+# Grab the stock implementation before django-fastdev patches it in ready()
+from django.template.base import FilterExpression  # noqa: E402
+
+stock_resolve = FilterExpression.resolve
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.template import (  # noqa: E402
+    Context,
+    Template,
+)
+
+fastdev_resolve = FilterExpression.resolve
+
+VARIABLES = 1000
+NUMBER = 20
+
+
+class Leaf:
+    @property
+    def value(self):
+        return 'value'
+
+
+class Node:
+    def __init__(self):
+        self.leaf = Leaf()
+
+    def get_leaf(self):
+        return self.leaf
+
+
+def run(name, resolve, template, context):
+    FilterExpression.resolve = resolve
+    try:
+        elapsed = min(timeit.repeat(lambda: template.render(context), number=NUMBER, repeat=5))
+    finally:
+        FilterExpression.resolve = fastdev_resolve
+    per_variable = elapsed / NUMBER / VARIABLES * 1e9
+    print(f'{name:>10}: {per_variable:8.1f} ns per variable')
+    return per_variable
+
+
+def main():
+    template = Template('{{ node.get_leaf.value|upper }}' * VARIABLES)
+    context = Context({'node': Node()})
+
+    stock = run('stock', stock_resolve, template, context)
+    fastdev = run('fastdev', fastdev_resolve, template, context)
+    print(f'{"overhead":>10}: {fastdev / stock:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
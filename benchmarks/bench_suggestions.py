@@ -0,0 +1,56 @@
+"""
+"Did you mean?" suggestions over a 10k name catalog, django-fastdev's
+trigram index compared to difflib.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_suggestions
+"""
+import difflib
+import random
+import timeit
+
+from django_fastdev import suggestions
+
+NAMES = 10_000
+LOOKUPS = 20
+
+
+def make_catalog():
+    rnd = random.Random(0)
+    apps = [f'app{i}' for i in range(100)]
+    words = ['list', 'detail', 'form', 'confirm_delete', 'base', 'table', 'row', 'edit', 'create', 'summary']
+    names = set()
+    while len(names) < NAMES:
+        names.add(f'{rnd.choice(apps)}/{rnd.choice(words)}_{rnd.randrange(100)}.html')
+    return sorted(names)
+
+
+def misspell(rnd, name):
+    i = rnd.randrange(len(name) - 1)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def main():
+    rnd = random.Random(1)
+    names = make_catalog()
+    originals = [rnd.choice(names) for _ in range(LOOKUPS)]
+    words = [misspell(rnd, name) for name in originals]
+
+    start = timeit.default_timer()
+    suggestions.get_close_matches(words[0], names)
+    print(f'{"index build":>12}: {(timeit.default_timer() - start) * 1e3:8.1f} ms (once per catalog)')
+
+    stock = min(timeit.repeat(lambda: [difflib.get_close_matches(w, names) for w in words], number=1, repeat=3)) / LOOKUPS
+    fastdev = min(timeit.repeat(lambda: [suggestions.get_close_matches(w, names) for w in words], number=1, repeat=3)) / LOOKUPS
+    print(f'{"difflib":>12}: {stock * 1e3:8.2f} ms per lookup')
+    print(f'{"fastdev":>12}: {fastdev * 1e3:8.2f} ms per lookup')
+    print(f'{"speedup":>12}: {stock / fastdev:8.1f}x')
+
+    stock_found = sum(name in difflib.get_close_matches(w, names) for w, name in zip(words, originals))
+    fastdev_found = sum(name in suggestions.get_close_matches(w, names) for w, name in zip(words, originals))
+    print(f'{"found":>12}: difflib {stock_found}/{LOOKUPS}, fastdev {fastdev_found}/{LOOKUPS}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark suite: the overhead of django-fastdev compared to stock Django.
+
+Every scenario is timed with the fastdev patches installed, and with them
+uninstalled, in the same process. Run from the repository root:
+
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --max-overhead 1.5 variables forms
+
+With --max-overhead the script exits with status 1 if any scenario is
+slower than that ratio, so it can be used to catch regressions.
+"""
+import argparse
+import logging
+import os
+import sys
+import timeit
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.forms import (  # noqa: E402
+    CharField,
+    Form,
+)
+from django.template import (  # noqa: E402
+    Context,
+    Engine,
+    Template,
+)
+
+from django_fastdev.apps import features  # noqa: E402
+
+REPEAT = 5
+
+
+class Leaf:
+    @property
+    def value(self):
+        return 'value'
+
+
+class Node:
+    def __init__(self):
+        self.leaf = Leaf()
+
+    def get_leaf(self):
+        return self.leaf
+
+
+def variables():
+    template = Template('{{ node.get_leaf.value|upper }} {{ missing|default:"x" }}\n' * 500)
+    context = Context({'node': Node()})
+    return lambda: template.render(context)
+
+
+def conditions():
+    template = Template('''{% load fastdev %}{% for row in rows %}
+        {% if row.a %}{% if row.b %}{{ row.a }}{% elif row.c %}{{ row.c }}{% endif %}{% endif %}
+        {% ifexists row.missing %}{{ row.missing }}{% elifexists row.b %}{{ row.b }}{% else %}-{% endifexists %}
+    {% endfor %}''')
+    context = Context({'rows': [{'a': i, 'b': i % 2, 'c': 'c'} for i in range(500)]})
+    return lambda: template.render(context)
+
+
+def extends_chain(depth=10, cached=True):
+    templates = {'level0.html': '<html>{% block content %}{% block level0 %}{% endblock %}{% endblock %}</html>'}
+    for i in range(1, depth):
+        templates[f'level{i}.html'] = f'{{% extends "level{i - 1}.html" %}}{{% block level{i - 1} %}}{{{{ i }}}}{{% block level{i} %}}{{% endblock %}}{{% endblock %}}'
+    templates['page.html'] = f'{{% extends "level{depth - 1}.html" %}}{{% block level{depth - 1} %}}page{{% endblock %}}'
+    loaders = [('django.template.loaders.locmem.Loader', templates)]
+    if cached:
+        # the default for every engine since Django 4.1, even with DEBUG on
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    engine = Engine(loaders=loaders, debug=True)
+    template = engine.get_template('page.html')
+    context = Context({'i': 1})
+    return lambda: template.render(context)
+
+
+class BenchmarkForm(Form):
+    a = CharField()
+    b = CharField()
+    c = CharField(required=False)
+
+    def clean_a(self):
+        return self.cleaned_data['a']
+
+    def clean_b(self):
+        return self.cleaned_data['b']
+
+
+def forms():
+    data = {'a': 'a', 'b': 'b'}
+
+    def validate():
+        for _ in range(200):
+            assert BenchmarkForm(data).is_valid()
+
+    return validate
+
+
+def queryset_get():
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    User.objects.get_or_create(username='benchmark')
+
+    def get():
+        for _ in range(200):
+            User.objects.get(username='benchmark')
+
+    return get
+
+
+SCENARIOS = {
+    'variables': variables,
+    'conditions': conditions,
+    'extends': extends_chain,
+    'extends_uncached': lambda: extends_chain(cached=False),
+    'forms': forms,
+    'queryset_get': queryset_get,
+}
+
+
+def best_time(run, number):
+    return min(timeit.repeat(run, number=number, repeat=REPEAT)) / number
+
+
+def measure(run, number):
+    run()  # warm up caches
+    fastdev = best_time(run, number)
+
+    patched_features = [x for x in features.values() if x.installed and x.originals]
+    for feature in patched_features:
+        feature.uninstall()
+    try:
+        run()
+        stock = best_time(run, number)
+    finally:
+        for feature in patched_features:
+            feature.install()
+
+    return stock, fastdev
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS), metavar='scenario', help=f'scenarios to run: {", ".join(SCENARIOS)} (default all)')
+    parser.add_argument('--number', type=int, default=20, help='runs per timing (default 20)')
+    parser.add_argument('--max-overhead', type=float, help='fail if fastdev/stock is above this ratio for any scenario')
+    args = parser.parse_args()
+    unknown = [x for x in args.scenarios if x not in SCENARIOS]
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(unknown)}')
+
+    # The form and extends checks only run with DEBUG on
+    settings.DEBUG = True
+    # Warnings logged by the checks would be repeated for every run, only print the results
+    logging.getLogger('django_fastdev').disabled = True
+
+    failed = False
+    print(f'{"scenario":<18}{"stock":>12}{"fastdev":>12}{"overhead":>10}')
+    for name in args.scenarios:
+        stock, fastdev = measure(SCENARIOS[name](), args.number)
+        ratio = fastdev / stock
+        print(f'{name:<18}{stock * 1e3:>9.3f} ms{fastdev * 1e3:>9.3f} ms{ratio:>9.2f}x')
+        if args.max_overhead is not None and ratio > args.max_overhead:
+            failed = True
+
+    if failed:
+        print(f'\nOverhead above {args.max_overhead}x', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
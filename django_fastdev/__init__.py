@@ -29,6 +29,3 @@ def off_thread_check_migrations(self, *args, **kwargs):
     t = Thread(target=inner)
     t.start()
 
-
-Command.check = off_thread_check
-Command.check_migrations = off_thread_check_migrations
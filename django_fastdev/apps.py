@@ -1,29 +1,36 @@
-import difflib
-import inspect
 import os
 import re
+import reprlib
 import subprocess
 import sys
 import threading
+import time
 from functools import cache
 from inspect import getmodule
+from itertools import islice
+from types import FunctionType
 from typing import Optional
+from weakref import WeakKeyDictionary
 import warnings
-from contextlib import (
-    contextmanager,
-    nullcontext,
-)
+from contextlib import nullcontext
+from contextvars import ContextVar
 from pathlib import Path
 
 from django.apps import AppConfig
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.db.models import (
     Model,
     QuerySet,
 )
 from django.forms import Form
-from django.template import Context
+from django.template import (
+    Context,
+    Template,
+    TemplateSyntaxError,
+)
 from django.template.base import (
+    UNKNOWN_SOURCE,
     FilterExpression,
     TextNode,
     Variable,
@@ -44,33 +51,215 @@ from django.template.loader_tags import (
     ExtendsNode,
 )
 from django.templatetags.i18n import BlockTranslateNode
+from django.urls import (
+    URLResolver,
+    get_resolver,
+    get_urlconf,
+)
 from django.urls.exceptions import NoReverseMatch
+from django.utils.safestring import (
+    SafeData,
+    mark_safe,
+)
+from django.utils.timezone import template_localtime
 from django.views.debug import DEBUG_ENGINE
 from django.template import engines
 from django.template.loaders.app_directories import Loader as AppDirLoader
 from django.template.loaders.filesystem import Loader as FilesystemLoader
+from django.test.signals import setting_changed
+from django.utils.autoreload import file_changed
+
+from django_fastdev.instrumentation import (
+    instrument,
+    instrumentation_enabled,
+)
+from django_fastdev.queries import (
+    called_through_relation,
+    current_get_tracker,
+    deferred_fields_mode,
+    n_plus_one_mode,
+    render_tracking_queries,
+    track_deferred_field,
+)
+from django_fastdev.suggestions import get_close_matches
 
 
 class FastDevVariableDoesNotExist(Exception):
-    pass
+    """
+    A template variable doesn't exist.
+
+    When raised by the variable resolution the exception only holds on to the
+    failed lookup. The message, which lists everything that is available, is
+    built the first time the exception is turned into a string, so code that
+    catches it (like `{% ifexists %}`) doesn't pay for it.
+    """
+
+    def __init__(self, message=None, *, var=None, bit=None, current=None, context=None):
+        super().__init__(message if message is not None else str(var))
+        self.message = message
+        self.var = var
+        self.bit = bit
+        self.current = current
+        # The context stacks change as rendering continues, so take a shallow
+        # copy of the list of dicts now. The dicts themselves are kept by reference.
+        self.current_dicts = list(current.dicts) if isinstance(current, Context) else None
+        self.context_dicts = list(context.dicts) if context is not None else None
+
+    def __str__(self):
+        if self.message is None:
+            self.message = self.format_message()
+        return self.message
+
+    def __reduce__(self):
+        # The context can hold anything, so pickle the message instead, as
+        # the parallel test runner does to send failures to the main process.
+        return type(self), (str(self),)
+
+    def format_message(self):
+        var, bit, current = self.var, self.bit, self.current
+        if len(var.lookups) == 1:
+            available_names = sorted(iter_context_keys(self.context_dicts))
+            available = '\n    '.join(available_names)
+            return f'''{var} does not exist in context. Available top level variables:
+
+    {available}
+{with_suggestions(bit, available_names)}'''
+
+        full_name = '.'.join(var.lookups)
+        extra = ''
+
+        if self.current_dicts is not None:
+            # same as Context.flatten() at the time of the failed lookup
+            current = {}
+            for d in self.current_dicts:
+                current.update(d)
+
+        if isinstance(current, dict):
+            available_keys = '\n    '.join(sorted(current.keys()))
+            extra = f'\nYou can access keys in the dict by their name. Available keys:\n\n    {available_keys}\n'
+            error = f"dict does not have a key '{bit}', and does not have a member {bit}"
+        else:
+            name = f'{type(current).__module__}.{type(current).__name__}'
+            error = f'{name} does not have a member {bit}'
+        available_names = sorted(x for x in dir(current) if not x.startswith('_'))
+        available = '\n    '.join(available_names)
+        if isinstance(current, dict):
+            available_names += current.keys()
+
+        return f'''Tried looking up {full_name} in context
+
+{error}
+{extra}
+Available attributes:
+
+    {available}
+
+The object was: {bounded_repr(current)}
+{with_suggestions(bit, available_names)}'''
+
+
+class BoundedRepr(reprlib.Repr):
+    """
+    A `reprlib.Repr` for error messages: containers are cut off after a number
+    of items and levels of nesting, and QuerySets that haven't been evaluated
+    are shown without running a query.
+    """
+    # reprlib only has this from Python 3.11, and uses '...' before that
+    fillvalue = '...'
+
+    def __init__(self, max_length, max_items, max_depth):
+        super().__init__()
+        self.max_length = max_length
+        self.maxlevel = max_depth
+        self.maxstring = self.maxlong = self.maxother = max_length
+        self.maxdict = self.maxlist = self.maxtuple = self.maxset = self.maxfrozenset = self.maxdeque = self.maxarray = max_items
+
+    def repr(self, x):
+        result = super().repr(x)
+        if len(result) > self.max_length:
+            result = result[:self.max_length - len(self.fillvalue)] + self.fillvalue
+        return result
+
+    def repr1(self, x, level):
+        if isinstance(x, QuerySet):
+            return self.repr_queryset(x, level)
+        # dispatch on the base type for subclasses too, so their items are bounded as well
+        for base in (dict, list, tuple, set, frozenset):
+            if isinstance(x, base) and type(x).__repr__ is base.__repr__:
+                return getattr(self, f'repr_{base.__name__}')(x, level)
+        return super().repr1(x, level)
+
+    def repr_dict(self, x, level):
+        # like reprlib, but keep the order of the dict instead of sorting the keys
+        if not x:
+            return '{}'
+        if level <= 0:
+            return '{' + self.fillvalue + '}'
+        pieces = [f'{self.repr1(k, level - 1)}: {self.repr1(v, level - 1)}' for k, v in islice(x.items(), self.maxdict)]
+        if len(x) > self.maxdict:
+            pieces.append(self.fillvalue)
+        return '{' + ', '.join(pieces) + '}'
+
+    def repr_queryset(self, x, level):
+        # noinspection PyProtectedMember
+        if x._result_cache is None:
+            return f'<{type(x).__name__} of {x.model.__name__}, not evaluated>'
+        # noinspection PyProtectedMember
+        return f'<{type(x).__name__} {self.repr_list(x._result_cache, level)}>'
+
+
+def bounded_repr(obj):
+    """
+    repr() for fastdev error messages, with limits from the settings
+    FASTDEV_REPR_MAX_LENGTH, FASTDEV_REPR_MAX_ITEMS and FASTDEV_REPR_MAX_DEPTH.
+    """
+    return BoundedRepr(
+        max_length=getattr(settings, 'FASTDEV_REPR_MAX_LENGTH', 1000),
+        max_items=getattr(settings, 'FASTDEV_REPR_MAX_ITEMS', 20),
+        max_depth=getattr(settings, 'FASTDEV_REPR_MAX_DEPTH', 4),
+    ).repr(obj)
+
+
+def iter_context_keys(dicts):
+    """
+    The unique names in a context stack (a Context or its list of dicts),
+    without building a merged dict like `Context.flatten()` does.
+    """
+    if isinstance(dicts, Context):
+        dicts = dicts.dicts
+    seen = set()
+    for d in dicts:
+        for key in d:
+            if key not in seen:
+                seen.add(key)
+                yield key
 
 
-_local = threading.local()
-_local.ignore_errors = False
-_local.deprecation_warning = None
+# (ignore errors, deprecation warning) for the template rendering going on in
+# this thread or asyncio task. A ContextVar, so every thread and task starts
+# out not ignoring errors, and nested blocks restore the outer state on exit.
+_ignore_errors = ContextVar('fastdev_ignore_errors', default=(False, None))
+
+
+class IgnoreTemplateErrors:
+    __slots__ = ('state', 'token')
+
+    def __init__(self, deprecation_warning=None):
+        self.state = (True, deprecation_warning)
+        self.token = None
+
+    def __enter__(self):
+        self.token = _ignore_errors.set(self.state)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ignore_errors.reset(self.token)
 
 
-@contextmanager
 def ignore_template_errors(deprecation_warning=None):
-    _local.ignore_errors = True
-    _local.deprecation_warning = deprecation_warning
-    try:
-        yield
-    finally:
-        _local.ignore_errors = False
-        _local.deprecation_warning = None
+    return IgnoreTemplateErrors(deprecation_warning)
 
 
+@cache
 def get_path_for_django_project() -> Path:
     try:
         path = settings.BASE_DIR
@@ -87,10 +276,14 @@ def get_gitignore_path():
         return None
 
 
+@cache
 def get_venv_path():
     """
     Retrieve the path to the active virtual environment, if any.
 
+    The result is cached for the lifetime of the process, call
+    `clear_path_caches()` if the environment changes.
+
     Returns:
         str or None: The path to the virtual environment, or None if not in a virtual environment.
     """
@@ -268,6 +461,10 @@ def get_models_with_badly_named_pk():
         )
 
 
+def fastdev_enabled():
+    return getattr(settings, 'FASTDEV_ENABLED', True)
+
+
 def strict_if():
     return getattr(settings, 'FASTDEV_STRICT_IF', False)
 
@@ -280,16 +477,30 @@ def strict_form_checking():
     return getattr(settings, "FASTDEV_STRICT_FORM_CHECKING", False)
 
 
+_is_from_project_cache = WeakKeyDictionary()
+
+
 def is_from_project(cls):
     """
     Check if a class originates from the project directory.
 
+    The answer is cached per class. The cache is weak-keyed, so dynamically
+    created classes can still be garbage collected.
+
     Args:
         cls: The class to check.
 
     Returns:
         bool: True if the class originates from the project directory, False otherwise.
     """
+    try:
+        return _is_from_project_cache[cls]
+    except KeyError:
+        result = _is_from_project_cache[cls] = _is_from_project(cls)
+        return result
+
+
+def _is_from_project(cls):
     module = getmodule(cls)
 
     # exit early if the module is built-in or dynamically created
@@ -311,12 +522,106 @@ def is_from_project(cls):
     return True
 
 
+CLEAN_PREFIX = 'clean_'
+
+
+class CleanMethods:
+    """
+    The clean_<field> methods of a form class, and the ones among them that
+    don't match any of the base fields of the class.
+    """
+    __slots__ = ('names', 'invalid_for_base_fields')
+
+    def __init__(self, form_class):
+        self.names = [
+            name
+            for name in dir(form_class)
+            if name.startswith(CLEAN_PREFIX) and callable(getattr(form_class, name))
+        ]
+        self.invalid_for_base_fields = [
+            name
+            for name in self.names
+            if name[len(CLEAN_PREFIX):] not in form_class.base_fields
+        ]
+
+
+_clean_methods_cache = WeakKeyDictionary()
+
+
+def get_clean_methods(form_class):
+    try:
+        return _clean_methods_cache[form_class]
+    except KeyError:
+        result = _clean_methods_cache[form_class] = CleanMethods(form_class)
+        return result
+
+
 def fastdev_ignore(target):
     """A decorator to exclude a function or class from fastdev checks."""
     setattr(target, "fastdev_ignore", True)
     return target
 
 
+MISSING = object()
+
+
+def resolve_or_missing(filter_expression, context):
+    """
+    Resolve like `FilterExpression.resolve(context, ignore_failures=True)`,
+    but return `MISSING` where fastdev would raise FastDevVariableDoesNotExist.
+
+    This is the cheap way to check if a variable exists, no exception is raised.
+    """
+    if not features['template_variables'].installed:
+        # without the fastdev resolve override, missing variables are never an error
+        return filter_expression.resolve(context, ignore_failures=True)
+    return filter_expression.resolve(context, ignore_failures=True, missing=MISSING)
+
+
+def apply_filters(filter_expression, obj, context):
+    """
+    Apply the filters of a FilterExpression to an already resolved value.
+
+    This is the second half of FilterExpression.resolve, split out so the
+    variable itself is only resolved once.
+    """
+    for func, args in filter_expression.filters:
+        arg_vals = []
+        for lookup, arg in args:
+            if not lookup:
+                arg_vals.append(mark_safe(arg))
+            else:
+                arg_vals.append(arg.resolve(context))
+        if getattr(func, 'expects_localtime', False):
+            obj = template_localtime(obj, context.use_tz)
+        if getattr(func, 'needs_autoescape', False):
+            new_obj = func(obj, autoescape=context.autoescape, *arg_vals)
+        else:
+            new_obj = func(obj, *arg_vals)
+        if getattr(func, 'is_safe', False) and isinstance(obj, SafeData):
+            obj = mark_safe(new_obj)
+        else:
+            obj = new_obj
+    return obj
+
+
+def resolve_invalid(filter_expression, context, ignore_failures=False):
+    """
+    The Django default behavior for a variable that failed to resolve, without
+    resolving it a second time.
+    """
+    if ignore_failures:
+        return apply_filters(filter_expression, None, context)
+
+    string_if_invalid = context.template.engine.string_if_invalid
+    if string_if_invalid:
+        if '%s' in string_if_invalid:
+            return string_if_invalid % filter_expression.var
+        return string_if_invalid
+
+    return apply_filters(filter_expression, string_if_invalid, context)
+
+
 @cache
 def get_ignored_template_list():
     ignored_templates_settings = getattr(settings, 'FASTDEV_IGNORED_TEMPLATES', [])
@@ -335,286 +640,766 @@ def template_is_ignored(origin_name):
     return False
 
 
-class FastDevConfig(AppConfig):
-    name = 'django_fastdev'
-    verbose_name = 'django-fastdev'
-    default = True
+def is_template_origin_from_project(origin_name):
+    """
+    Check if a template origin is one fastdev should check for missing variables
+    when FASTDEV_STRICT_TEMPLATE_CHECKING is not set.
+    """
+    if origin_name == '<unknown source>' or 'django-fastdev/tests/' in origin_name:
+        return True
 
-    def ready(self):
-        orig_resolve = FilterExpression.resolve
-
-        def resolve_override(self, context, ignore_failures=False, ignore_failures_for_real=False):
-            if context.template_name is None and '{% if exception_type %}{{ exception_type }}' in context.template.source:
-                # best guess we are in the 500 error page, do the default
-                return orig_resolve(self, context)
-
-            # If a template has been explicitly ignored by the developer, do the default
-            if template_is_ignored(context.template.origin.name):
-                return orig_resolve(self, context)
-
-            if isinstance(self.var, Variable):
-                try:
-                    self.var.resolve(context)
-                except FastDevVariableDoesNotExist:
-                    raise
-                except VariableDoesNotExist as e:
-                    # If the filter includes default or default_if_none, suppress
-                    # the exception and return None
-                    if any(
-                        filter == default
-                        for filter, args in self.filters
-                    ):
-                        return orig_resolve(self, context)
-
-                    if not strict_template_checking():
-                        # worry only about templates inside our project dir; if they
-                        # exist elsewhere, then go to standard django behavior
-                        venv_dir = get_venv_path()
-                        project_dir = get_path_for_django_project()
-                        origin = context.template.origin.name
-                        if (
-                            origin != '<unknown source>'
-                            and 'django-fastdev/tests/' not in origin
-                            and (
-                                not origin.startswith(str(project_dir))
-                                or (bool(venv_dir) and origin.startswith(str(venv_dir)))
-                            )
-                        ):
-                            return orig_resolve(self, context, ignore_failures=ignore_failures)
-                    if ignore_failures_for_real or getattr(_local, 'ignore_errors', False):
-                        if _local.deprecation_warning:
-                            warnings.warn(_local.deprecation_warning, category=DeprecationWarning)
-                        return orig_resolve(self, context, ignore_failures=True)
-
-                    if context.template.engine == DEBUG_ENGINE:
-                        return orig_resolve(self, context, ignore_failures=ignore_failures)
-
-                    bit, current = e.params
-                    if len(self.var.lookups) == 1:
-                        available = '\n    '.join(sorted(context.flatten().keys()))
-                        raise FastDevVariableDoesNotExist(f'''{self.var} does not exist in context. Available top level variables:
+    venv_dir = get_venv_path()
+    project_dir = get_path_for_django_project()
+    if not origin_name.startswith(str(project_dir)):
+        return False
+    if venv_dir and origin_name.startswith(str(venv_dir)):
+        return False
+    return True
 
-    {available}
-''')
-                    else:
-                        full_name = '.'.join(self.var.lookups)
-                        extra = ''
 
-                        if isinstance(current, Context):
-                            current = current.flatten()
+_policy_generation = 0
 
-                        if isinstance(current, dict):
-                            available_keys = '\n    '.join(sorted(current.keys()))
-                            extra = f'\nYou can access keys in the dict by their name. Available keys:\n\n    {available_keys}\n'
-                            error = f"dict does not have a key '{bit}', and does not have a member {bit}"
-                        else:
-                            name = f'{type(current).__module__}.{type(current).__name__}'
-                            error = f'{name} does not have a member {bit}'
-                        available = '\n    '.join(sorted(x for x in dir(current) if not x.startswith('_')))
+TECHNICAL_500_MARKER = '{% if exception_type %}{{ exception_type }}'
 
-                        raise FastDevVariableDoesNotExist(f'''Tried looking up {full_name} in context
 
-{error}
-{extra}
-Available attributes:
+def is_technical_500_template(template):
+    # best guess we are in the 500 error page: it's compiled with from_string(), so it has no name
+    return template.name is None and TECHNICAL_500_MARKER in template.source
 
-    {available}
 
-The object was: {current!r}
-''')
+class TemplatePolicy:
+    """
+    The fastdev checks that apply to a compiled template.
+
+    These only depend on the template origin, the engine and the settings, so
+    they are computed once per template and stored on it as `_fastdev_policy`.
+    """
+    __slots__ = ('generation', 'technical_500', 'ignored', 'check_variables', 'debug_engine')
+
+    def __init__(self, template):
+        self.generation = _policy_generation
+        self.technical_500 = is_technical_500_template(template)
+        self.ignored = template_is_ignored(template.origin.name)
+        self.check_variables = strict_template_checking() or is_template_origin_from_project(template.origin.name)
+        self.debug_engine = template.engine == DEBUG_ENGINE
 
-            return orig_resolve(self, context, ignore_failures)
 
-        FilterExpression.resolve = resolve_override
+def get_template_policy(template):
+    policy = getattr(template, '_fastdev_policy', None)
+    if policy is None or policy.generation != _policy_generation:
+        policy = TemplatePolicy(template)
+        template._fastdev_policy = policy
+    return policy
 
-        # {% firstof %}
-        first_of_render_orig = FirstOfNode.render
 
-        def first_of_render_override(self, context):
-            with ignore_template_errors():
-                return first_of_render_orig(self, context)
+def invalidate_template_policies():
+    global _policy_generation
+    _policy_generation += 1
 
-        FirstOfNode.render = first_of_render_override
 
-        # {% if %}
-        def if_render_override(self, context):
-            for condition, nodelist in self.conditions_nodelists:
-                if condition is not None:  # if / elif clause
-                    context_handler = nullcontext()
-                    if not strict_if() or '{% if exception_type %}{{ exception_type }}' in context.template.source:
-                        context_handler = ignore_template_errors(deprecation_warning='set FASTDEV_STRICT_IF in settings, and use {% ifexists %} instead of {% if %} to check if a variable exists.')
+def clear_path_caches():
+    get_path_for_django_project.cache_clear()
+    get_venv_path.cache_clear()
+    _is_from_project_cache.clear()
+    invalidate_template_policies()
 
-                    with context_handler:
-                        try:
-                            match = condition.eval(context)
-                        except VariableDoesNotExist:
-                            match = None
-                else:  # else clause
-                    match = True
 
-                if match:
-                    return nodelist.render(context)
+def fastdev_setting_changed(setting, **kwargs):
+    if setting in ('BASE_DIR', 'ROOT_DIR'):
+        clear_path_caches()
+    if setting == 'FASTDEV_IGNORED_TEMPLATES':
+        get_ignored_template_list.cache_clear()
+        template_is_ignored.cache_clear()
+    if setting == 'TEMPLATES':
+        invalidate_valid_blocks()
+        _template_catalogs.clear()
+    if setting in ('FASTDEV_N_PLUS_ONE_QUERIES', 'FASTDEV_DEFERRED_FIELDS'):
+        update_render_tracking()
+    invalidate_template_policies()
 
-            return ''
 
-        IfNode.render = if_render_override
+setting_changed.connect(fastdev_setting_changed)
 
-        # Better reverse() errors
-        import django.urls.resolvers as res
-        res.NoReverseMatch = FastDevNoReverseMatch
-        import django.urls.base as bas
-        bas.NoReverseMatch = FastDevNoReverseMatchNamespace
 
-        # Forms validation
-        orig_form_full_clean = Form.full_clean
+def collect_nested_blocks(node):
+    if isinstance(node, BlockNode):
+        result = {node.name}
+    else:
+        result = set()
+    for child_nodelist_name in node.child_nodelists:
+        if hasattr(node, child_nodelist_name):
+            for x in getattr(node, child_nodelist_name):
+                result |= collect_nested_blocks(x)
+    return result
 
-        def fastdev_full_clean(self):
-            orig_form_full_clean(self)
-            # check if class is from our project, or strict form checking is enabled
-            if (is_from_project(type(self)) or strict_form_checking()) and not getattr(
-                self, 'fastdev_ignore', False
-            ):
-                from django.conf import settings
 
-                if settings.DEBUG:
-                    prefix = 'clean_'
-                    for name in dir(self):
-                        if (
-                            name.startswith(prefix)
-                            and callable(getattr(self, name))
-                            and name[len(prefix) :] not in self.fields
-                        ):
-                            fields = '\n    '.join(sorted(self.fields.keys()))
+def get_extends_node_parent(extends_node, context):
+    compiled_parent = extends_node.get_parent(context)
+    del context.render_context[extends_node.context_key]  # remove our history of doing this
+    return compiled_parent
 
-                            raise InvalidCleanMethod(f"""Clean method {name} of class {self.__class__.__name__} won't apply to any field. Available fields:
 
-    {fields}""")
+def get_static_name(filter_expression):
+    # "literal.html" as opposed to a variable
+    if isinstance(filter_expression.var, Variable) or filter_expression.filters:
+        return None
+    return str(filter_expression.var)
+
+
+def has_static_parent(extends_node):
+    # {% extends "literal.html" %} as opposed to {% extends var %}
+    return get_static_name(extends_node.parent_name) is not None
+
+
+_valid_blocks_generation = 0
+
+
+def invalidate_valid_blocks(**kwargs):
+    global _valid_blocks_generation
+    _valid_blocks_generation += 1
+
+
+# A changed source file means the template loaders will hand out new parent templates
+file_changed.connect(invalidate_valid_blocks)
+
+
+def collect_valid_blocks(template, context):
+    """
+    All block names that can be overridden when extending `template`.
+
+    The result is cached on the template when its whole inheritance chain is
+    made of static `{% extends %}` tags, so the chain is only walked again
+    after a source file changes.
+    """
+    return _collect_valid_blocks(template, context)[0]
+
+
+def _collect_valid_blocks(template, context, static_only=False):
+    # With `static_only`, the result is None if the chain has an {% extends var %}
+    cached = getattr(template, '_fastdev_valid_blocks', None)
+    if cached is not None and cached[0] == _valid_blocks_generation:
+        return cached[1], True
+
+    result = set()
+    cacheable = True
+    for x in template.nodelist:
+        if isinstance(x, ExtendsNode):
+            if static_only and not has_static_parent(x):
+                return None, False
+            result |= collect_nested_blocks(x)
+            parent_blocks, parent_cacheable = _collect_valid_blocks(get_extends_node_parent(x, context), context, static_only)
+            if parent_blocks is None:
+                return None, False
+            result |= parent_blocks
+            cacheable = cacheable and parent_cacheable and has_static_parent(x)
+        elif hasattr(x, 'child_nodelists'):
+            # to be more explicit, could make the condition above
+            # 'isinstance(x, (AutoEscapeControlNode, BlockNode, FilterNode, ForNode, IfNode,
+            # IfChangedNode, SpacelessNode))' at the risk of missing some we don't know about
+            result |= collect_nested_blocks(x)
+
+    result = frozenset(result)
+    if cacheable:
+        template._fastdev_valid_blocks = (_valid_blocks_generation, result)
+    return result, cacheable
+
+
+def validate_extends_node(extends_node, compiled_parent, context):
+    """Raise if `extends_node` is invalid. Returns True if the whole chain of `compiled_parent` is static."""
+    valid_blocks, static_chain = _collect_valid_blocks(compiled_parent, context)
+    actual_blocks = {x.name for x in extends_node.nodelist if isinstance(x, BlockNode)}
+    invalid_blocks = actual_blocks - valid_blocks
+    if invalid_blocks:
+        invalid_names = '    ' + '\n    '.join(sorted(invalid_blocks))
+        valid_names = '    ' + '\n    '.join(sorted(valid_blocks))
+        raise Exception(f'Invalid blocks specified:\n\n{invalid_names}\n\nValid blocks:\n\n{valid_names}')
+
+    # Validate no thrown away (non-whitespace) text blocks
+    thrown_away_text = '\n    '.join([repr(x.s.strip()) for x in extends_node.nodelist if isinstance(x, TextNode) and x.s.strip()])
+    assert not thrown_away_text, f'The following html was thrown away when rendering {extends_node.origin.template_name}:\n\n    {thrown_away_text}'
+    return static_chain
+
+
+def get_extends_node(template):
+    # The ExtendsNode has to be the first non-text node.
+    for node in template.nodelist:
+        if not isinstance(node, TextNode):
+            return node if isinstance(node, ExtendsNode) else None
+    return None
+
+
+# Set while the parents of a template are loaded for validation. Without a
+# cached loader every parent is compiled again, and validating those too
+# would walk the rest of the chain once per level.
+_validating_extends = ContextVar('fastdev_validating_extends', default=False)
+
+
+def validate_extends_at_compile_time(template):
+    """
+    Validate `{% extends "literal.html" %}` when the template is compiled, so
+    rendering doesn't have to. Chains with a dynamic parent anywhere in them
+    are validated at render time, when the variable can be resolved.
+    """
+    if _validating_extends.get():
+        return
+
+    extends_node = get_extends_node(template)
+    if extends_node is None or not has_static_parent(extends_node):
+        return
+
+    context = Context()
+    context.template = template
+    generation = _valid_blocks_generation
+    token = _validating_extends.set(True)
+    try:
+        try:
+            compiled_parent = get_extends_node_parent(extends_node, context)
+            if _collect_valid_blocks(compiled_parent, context, static_only=True)[0] is None:
+                return
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            # leave it to rendering to raise the error in the normal way
+            return
+
+        validate_extends_node(extends_node, compiled_parent, context)
+    finally:
+        _validating_extends.reset(token)
+    extends_node._fastdev_validated = generation
+
+
+_NOT_SET = object()
+
+
+class Feature:
+    """
+    A group of monkeypatches that can be installed and uninstalled at runtime.
+
+    `install_patches` is called with the feature, and uses `feature.patch()`
+    to replace attributes so they can be put back by `uninstall()`.
+    """
+
+    def __init__(self, name, install_patches):
+        self.name = name
+        self.install_patches = install_patches
+        self.originals = None
+
+    def __repr__(self):
+        return f'<Feature {self.name}>'
+
+    @property
+    def installed(self):
+        return self.originals is not None
+
+    def patch(self, target, attribute, replacement):
+        if isinstance(replacement, FunctionType) and instrumentation_enabled():
+            replacement = instrument(replacement.__name__, replacement)
+        if isinstance(target, dict):
+            # like the tags of a template Library
+            self.originals.append((target, attribute, target.get(attribute, _NOT_SET)))
+            target[attribute] = replacement
+            return
+        # use __dict__ to tell apart attributes defined on target from inherited ones
+        self.originals.append((target, attribute, vars(target).get(attribute, _NOT_SET)))
+        setattr(target, attribute, replacement)
+
+    def install(self):
+        if self.installed:
+            return
+        self.originals = []
+        self.install_patches(self)
+
+    def uninstall(self):
+        if not self.installed:
+            return
+        for target, attribute, original in reversed(self.originals):
+            if isinstance(target, dict):
+                if original is _NOT_SET:
+                    del target[attribute]
+                else:
+                    target[attribute] = original
+            elif original is _NOT_SET:
+                delattr(target, attribute)
+            else:
+                setattr(target, attribute, original)
+        self.originals = None
 
-        Form.full_clean = fastdev_full_clean
 
-        # QuerySet error messages
-        orig_queryset_get = QuerySet.get
+def install_template_variable_checks(feature):
+    orig_resolve = FilterExpression.resolve
 
-        def fixup_query_exception(e, args, kwargs):
-            assert len(e.args) == 1
-            message = e.args[0]
-            if args:
-                message += f'\n\nQuery args:\n\n    {args}'
-            if kwargs:
-                kwargs = '\n    '.join([f'{k}: {v!r}' for k, v in kwargs.items()])
-                message += f'\n\nQuery kwargs:\n\n    {kwargs}'
-            e.args = (message,)
+    def resolve_override(self, context, ignore_failures=False, ignore_failures_for_real=False, missing=None):
+        policy = get_template_policy(context.template)
 
-        def fast_dev_get(self, *args, **kwargs):
+        # In the 500 error page, or if a template has been explicitly
+        # ignored by the developer, do the default
+        if policy.technical_500 or policy.ignored:
+            return orig_resolve(self, context)
+
+        if isinstance(self.var, Variable):
             try:
-                return orig_queryset_get(self, *args, **kwargs)
-            except self.model.DoesNotExist as e:
-                fixup_query_exception(e, args, kwargs)
-                raise
-            except self.model.MultipleObjectsReturned as e:
-                fixup_query_exception(e, args, kwargs)
+                obj = self.var.resolve(context)
+            except FastDevVariableDoesNotExist:
                 raise
+            except VariableDoesNotExist as e:
+                # If the filter includes default or default_if_none, suppress
+                # the exception and return None
+                if any(
+                    filter == default
+                    for filter, args in self.filters
+                ):
+                    return resolve_invalid(self, context)
 
-        QuerySet.get = fast_dev_get
+                # worry only about templates inside our project dir (unless strict
+                # checking is on); if they exist elsewhere, then go to standard django behavior
+                if not policy.check_variables:
+                    return resolve_invalid(self, context, ignore_failures=ignore_failures)
 
-        if settings.DEBUG:
-            # Gitignore validation
-            git_ignore = get_gitignore_path()
-            if git_ignore:
-                threading.Thread(target=validate_gitignore, args=(git_ignore, )).start()
+                ignore_errors, deprecation_warning = _ignore_errors.get()
+                if ignore_failures_for_real or ignore_errors:
+                    if deprecation_warning:
+                        warnings.warn(deprecation_warning, category=DeprecationWarning)
+                    return resolve_invalid(self, context, ignore_failures=True)
 
-            # ForeignKey validation
-            threading.Thread(target=get_models_with_badly_named_pk).start()
+                if policy.debug_engine:
+                    return resolve_invalid(self, context, ignore_failures=ignore_failures)
 
-        # Fix blocktrans
-        orig_blocktrans_render_token_list = BlockTranslateNode.render_token_list
+                if missing is not None:
+                    return missing
 
-        validate_static_url_setting()
+                bit, current = e.params
+                raise FastDevVariableDoesNotExist(var=self.var, bit=bit, current=current, context=context)
 
-        def fastdev_render_token_list(self, tokens):
-            for token in tokens:
-                if token.token_type == TokenType.VAR:
-                    if '.' in token.contents:
-                        raise FastDevVariableDoesNotExist("You can't use dotted paths in blocktrans. You must use {% with foo = something.bar %} around the blocktrans.")
-            return orig_blocktrans_render_token_list(self, tokens)
+            # resolve once, then apply the filters to that result
+            return apply_filters(self, obj, context)
 
-        BlockTranslateNode.render_token_list = fastdev_render_token_list
+        return orig_resolve(self, context, ignore_failures)
+
+    feature.patch(FilterExpression, 'resolve', resolve_override)
+
+    # {% firstof %}
+    first_of_render_orig = FirstOfNode.render
+
+    def first_of_render_override(self, context):
+        with ignore_template_errors():
+            return first_of_render_orig(self, context)
+
+    feature.patch(FirstOfNode, 'render', first_of_render_override)
+
+    # {% if %}
+    def if_render_override(self, context):
+        for condition, nodelist in self.conditions_nodelists:
+            if condition is not None:  # if / elif clause
+                context_handler = nullcontext()
+                if not strict_if() or get_template_policy(context.template).technical_500:
+                    context_handler = ignore_template_errors(deprecation_warning='set FASTDEV_STRICT_IF in settings, and use {% ifexists %} instead of {% if %} to check if a variable exists.')
+
+                with context_handler:
+                    try:
+                        match = condition.eval(context)
+                    except VariableDoesNotExist:
+                        match = None
+            else:  # else clause
+                match = True
+
+            if match:
+                return nodelist.render(context)
+
+        return ''
+
+    feature.patch(IfNode, 'render', if_render_override)
+
+
+def install_reverse_errors(feature):
+    import django.urls.resolvers as res
+    feature.patch(res, 'NoReverseMatch', FastDevNoReverseMatch)
+
+    orig_reverse_with_prefix = res.URLResolver._reverse_with_prefix
+
+    def reverse_with_prefix(self, *args, **kwargs):
+        try:
+            return orig_reverse_with_prefix(self, *args, **kwargs)
+        except FastDevNoReverseMatch as e:
+            if e.resolver is not None:
+                # reverse() calls this on the resolver of the namespace, which scopes the list of names
+                e.raised_by = self
+            raise
+
+    feature.patch(res.URLResolver, '_reverse_with_prefix', reverse_with_prefix)
+    import django.urls.base as bas
+    feature.patch(bas, 'NoReverseMatch', FastDevNoReverseMatchNamespace)
+
+
+def install_url_name_checks(feature):
+    from django.template import defaulttags
+
+    orig_url = defaulttags.register.tags['url']
+
+    def fastdev_url(parser, token):
+        node = orig_url(parser, token)
+        if settings.DEBUG:
+            origin_name = parser.origin.name if parser.origin is not None else UNKNOWN_SOURCE
+            if url_names_can_be_checked() and not template_is_ignored(origin_name) and (strict_template_checking() or is_template_origin_from_project(origin_name)):
+                validate_url_node(node)
+        return node
+
+    # The tag function is copied into every Parser from the library, so patch it there
+    feature.patch(defaulttags.register.tags, 'url', fastdev_url)
+
+
+def install_form_clean_method_checks(feature):
+    orig_form_full_clean = Form.full_clean
+
+    def fastdev_full_clean(self):
+        orig_form_full_clean(self)
+        # check if class is from our project, or strict form checking is enabled
+        if (is_from_project(type(self)) or strict_form_checking()) and not getattr(
+            self, 'fastdev_ignore', False
+        ):
+            from django.conf import settings
 
-        # Extends validation
-        def collect_nested_blocks(node):
-            if isinstance(node, BlockNode):
-                result = {node.name}
-            else:
-                result = set()
-            for child_nodelist_name in node.child_nodelists:
-                if hasattr(node, child_nodelist_name):
-                    for x in getattr(node, child_nodelist_name):
-                        result |= collect_nested_blocks(x)
-            return result
-
-        def get_extends_node_parent(extends_node, context):
-            compiled_parent = extends_node.get_parent(context)
-            del context.render_context[extends_node.context_key]  # remove our history of doing this
-            return compiled_parent
-
-        def collect_valid_blocks(template, context):
-            result = set()
-            for x in template.nodelist:
-                if isinstance(x, ExtendsNode):
-                    result |= collect_nested_blocks(x)
-                    result |= collect_valid_blocks(get_extends_node_parent(x, context), context)
-                elif hasattr(x, 'child_nodelists'):
-                    # to be more explicit, could make the condition above
-                    # 'isinstance(x, (AutoEscapeControlNode, BlockNode, FilterNode, ForNode, IfNode,
-                    # IfChangedNode, SpacelessNode))' at the risk of missing some we don't know about
-                    result |= collect_nested_blocks(x)
-            return result
-
-        orig_extends_render = ExtendsNode.render
-
-        def extends_render(self, context):
             if settings.DEBUG:
-                valid_blocks = collect_valid_blocks(get_extends_node_parent(self, context), context)
-                actual_blocks = {x.name for x in self.nodelist if isinstance(x, BlockNode)}
-                invalid_blocks = actual_blocks - valid_blocks
-                if invalid_blocks:
-                    invalid_names = '    ' + '\n    '.join(sorted(invalid_blocks))
-                    valid_names = '    ' + '\n    '.join(sorted(valid_blocks))
-                    raise Exception(f'Invalid blocks specified:\n\n{invalid_names}\n\nValid blocks:\n\n{valid_names}')
+                if self.fields.keys() == self.base_fields.keys():
+                    invalid_clean_methods = get_clean_methods(type(self)).invalid_for_base_fields
+                else:
+                    invalid_clean_methods = [
+                        name
+                        for name in get_clean_methods(type(self)).names
+                        if name[len(CLEAN_PREFIX):] not in self.fields
+                    ]
+                # clean_ methods can also be assigned on the instance, which the per-class cache doesn't see
+                invalid_instance_methods = [
+                    name
+                    for name, value in vars(self).items()
+                    if name.startswith(CLEAN_PREFIX) and callable(value) and name[len(CLEAN_PREFIX):] not in self.fields
+                ]
+                if invalid_instance_methods:
+                    invalid_clean_methods = sorted({*invalid_clean_methods, *invalid_instance_methods})
+                if invalid_clean_methods:
+                    name = invalid_clean_methods[0]
+                    fields = '\n    '.join(sorted(self.fields.keys()))
+
+                    raise InvalidCleanMethod(f"""Clean method {name} of class {self.__class__.__name__} won't apply to any field. Available fields:
 
-                # Validate no thrown away (non-whitespace) text blocks
-                thrown_away_text = '\n    '.join([repr(x.s.strip()) for x in self.nodelist if isinstance(x, TextNode) and x.s.strip()])
-                assert not thrown_away_text, f'The following html was thrown away when rendering {self.origin.template_name}:\n\n    {thrown_away_text}'
+    {fields}""")
 
-            return orig_extends_render(self, context)
+    feature.patch(Form, 'full_clean', fastdev_full_clean)
 
-        ExtendsNode.render = extends_render
 
-        def fastdev_model__repr__(self):
-            return "<%s pk=%s>" % (self.__class__.__name__, self.pk)
+def install_queryset_get_errors(feature):
+    orig_queryset_get = QuerySet.get
 
-        Model.__repr__ = fastdev_model__repr__
+    def fixup_query_exception(e, args, kwargs):
+        assert len(e.args) == 1
+        message = e.args[0]
+        if args:
+            message += f'\n\nQuery args:\n\n    {bounded_repr(args)}'
+        if kwargs:
+            kwargs = '\n    '.join([f'{k}: {bounded_repr(v)}' for k, v in kwargs.items()])
+            message += f'\n\nQuery kwargs:\n\n    {kwargs}'
+        e.args = (message,)
 
-        TemplateDoesNotExist.__str__ = fastdev_template_does_not_exist_error
+    def fast_dev_get(self, *args, **kwargs):
+        tracker = current_get_tracker.get()
+        if tracker is not None:
+            tracker.add(self.model, args, kwargs, through_relation=called_through_relation(sys._getframe(1)))
+        try:
+            return orig_queryset_get(self, *args, **kwargs)
+        except self.model.DoesNotExist as e:
+            fixup_query_exception(e, args, kwargs)
+            raise
+        except self.model.MultipleObjectsReturned as e:
+            fixup_query_exception(e, args, kwargs)
+            raise
 
+    feature.patch(QuerySet, 'get', fast_dev_get)
 
-def get_template_files(directory):
-    templates = []
 
-    if not os.path.exists(directory):
+def install_blocktrans_checks(feature):
+    orig_blocktrans_render_token_list = BlockTranslateNode.render_token_list
+
+    def fastdev_render_token_list(self, tokens):
+        for token in tokens:
+            if token.token_type == TokenType.VAR:
+                if '.' in token.contents:
+                    raise FastDevVariableDoesNotExist("You can't use dotted paths in blocktrans. You must use {% with foo = something.bar %} around the blocktrans.")
+        return orig_blocktrans_render_token_list(self, tokens)
+
+    feature.patch(BlockTranslateNode, 'render_token_list', fastdev_render_token_list)
+
+
+def install_extends_checks(feature):
+    orig_extends_render = ExtendsNode.render
+
+    def extends_render(self, context):
+        if settings.DEBUG and getattr(self, '_fastdev_validated', None) != _valid_blocks_generation:
+            # dynamic {% extends var %}, or a template that wasn't validated when it was compiled
+            generation = _valid_blocks_generation
+            static_chain = validate_extends_node(self, get_extends_node_parent(self, context), context)
+            # a {% extends var %} anywhere in the chain can pick another parent next time
+            if static_chain and has_static_parent(self):
+                self._fastdev_validated = generation
+
+        return orig_extends_render(self, context)
+
+    feature.patch(ExtendsNode, 'render', extends_render)
+
+    orig_template_init = Template.__init__
+
+    def fastdev_template_init(self, *args, **kwargs):
+        orig_template_init(self, *args, **kwargs)
+        if settings.DEBUG:
+            validate_extends_at_compile_time(self)
+
+    feature.patch(Template, '__init__', fastdev_template_init)
+
+
+class RenderTrackingFeature(Feature):
+    """
+    A feature that tracks queries while templates render. Template.render is
+    patched once for all of them, and only while one of them is installed
+    and turned on with its setting, so rendering doesn't pay for it otherwise.
+    """
+
+    def __init__(self, name, install_patches, get_mode):
+        super().__init__(name, install_patches)
+        self.get_mode = get_mode
+
+    def mode(self):
+        return self.get_mode() if self.installed else None
+
+    def install(self):
+        super().install()
+        update_render_tracking()
+
+    def uninstall(self):
+        super().uninstall()
+        update_render_tracking()
+
+
+def install_render_tracking(feature):
+    orig_template_render = Template.render
+
+    def fastdev_template_render(self, context):
+        return render_tracking_queries(
+            orig_template_render, self, context,
+            n_plus_one=features['n_plus_one_queries'].mode(),
+            deferred_fields=features['deferred_fields'].mode(),
+        )
+
+    feature.patch(Template, 'render', fastdev_template_render)
+
+
+# The Template.render patch shared by the RenderTrackingFeatures
+render_tracking = Feature('render_tracking', install_render_tracking)
+
+
+def update_render_tracking():
+    if any(x.mode() is not None for x in features.values() if isinstance(x, RenderTrackingFeature)):
+        render_tracking.install()
+    else:
+        render_tracking.uninstall()
+
+
+def install_n_plus_one_detection(feature):
+    # the queries are tracked by the shared Template.render patch
+    pass
+
+
+def install_deferred_field_detection(feature):
+    from django.db.models.query_utils import DeferredAttribute
+
+    orig_deferred_get = DeferredAttribute.__get__
+
+    # Loaded fields are found in the instance __dict__ first, so this is only called for deferred fields
+    def fastdev_deferred_get(self, instance, cls=None):
+        if instance is not None and self.field.attname not in instance.__dict__:
+            track_deferred_field(instance, self.field.attname)
+        return orig_deferred_get(self, instance, cls)
+
+    feature.patch(DeferredAttribute, '__get__', fastdev_deferred_get)
+
+
+def install_model_repr(feature):
+    def fastdev_model__repr__(self):
+        return "<%s pk=%s>" % (self.__class__.__name__, self.pk)
+
+    feature.patch(Model, '__repr__', fastdev_model__repr__)
+
+
+def install_template_does_not_exist_errors(feature):
+    feature.patch(TemplateDoesNotExist, '__str__', fastdev_template_does_not_exist_error)
+
+
+def install_runserver_checks_in_thread(feature):
+    from django.core.management.commands.runserver import Command
+    from django_fastdev import (
+        off_thread_check,
+        off_thread_check_migrations,
+    )
+    feature.patch(Command, 'check', off_thread_check)
+    feature.patch(Command, 'check_migrations', off_thread_check_migrations)
+
+
+def install_startup_checks(feature):
+    # These are one-off checks, there is nothing to patch
+    if settings.DEBUG:
+        # Gitignore validation
+        git_ignore = get_gitignore_path()
+        if git_ignore:
+            threading.Thread(target=validate_gitignore, args=(git_ignore, )).start()
+
+        # ForeignKey validation
+        threading.Thread(target=get_models_with_badly_named_pk).start()
+
+    validate_static_url_setting()
+
+
+features = {
+    feature.name: feature
+    for feature in [
+        Feature('template_variables', install_template_variable_checks),
+        Feature('reverse_errors', install_reverse_errors),
+        Feature('url_names', install_url_name_checks),
+        Feature('form_clean_methods', install_form_clean_method_checks),
+        Feature('queryset_get_errors', install_queryset_get_errors),
+        Feature('blocktrans', install_blocktrans_checks),
+        Feature('extends', install_extends_checks),
+        RenderTrackingFeature('n_plus_one_queries', install_n_plus_one_detection, n_plus_one_mode),
+        RenderTrackingFeature('deferred_fields', install_deferred_field_detection, deferred_fields_mode),
+        Feature('model_repr', install_model_repr),
+        Feature('template_does_not_exist_errors', install_template_does_not_exist_errors),
+        Feature('runserver_checks_in_thread', install_runserver_checks_in_thread),
+        Feature('startup_checks', install_startup_checks),
+    ]
+}
+
+
+def get_enabled_features():
+    """
+    The features to install, from the FASTDEV_FEATURES setting: a dict of
+    feature name to bool. Features not in the dict are enabled.
+    """
+    settings_features = getattr(settings, 'FASTDEV_FEATURES', {})
+    unknown = set(settings_features) - set(features)
+    if unknown:
+        valid = '\n    '.join(features)
+        raise ImproperlyConfigured(f'Unknown features in FASTDEV_FEATURES: {", ".join(sorted(unknown))}. Valid features:\n\n    {valid}')
+    return [feature for name, feature in features.items() if settings_features.get(name, True)]
+
+
+def install_feature(name):
+    features[name].install()
+
+
+def uninstall_feature(name):
+    features[name].uninstall()
+
+
+class FastDevConfig(AppConfig):
+    name = 'django_fastdev'
+    verbose_name = 'django-fastdev'
+    default = True
+
+    def ready(self):
+        if not fastdev_enabled():
+            # Don't touch Django at all, so there's no overhead in production
+            return
+
+        for feature in get_enabled_features():
+            feature.install()
+
+
+DEFAULT_TEMPLATE_EXTENSIONS = [".html", ".htm", ".django", ".jinja", ".md"]
+
+
+def get_template_extensions():
+    return tuple(getattr(settings, "SHOWTEMPLATE_EXTENSIONS", DEFAULT_TEMPLATE_EXTENSIONS))
+
+
+class TemplateCatalog:
+    """
+    The template files under a directory, kept in memory between calls.
+
+    Every directory in the tree is stored with its modification time. Adding,
+    removing or renaming a file or subdirectory changes the mtime of the
+    directory containing it, so a refresh only has to stat the known
+    directories and rescan the ones that changed. Directories modified in
+    the last second are always rescanned, as file system timestamps are too
+    coarse to tell apart changes made right after the previous scan.
+    """
+    racy_ns = 1_000_000_000
+
+    def __init__(self, directory, extensions):
+        self.directory = directory
+        self.extensions = extensions
+        # relative path -> (mtime_ns, subdirectory names, template file names)
+        self.entries = {}
+
+    def _scan(self, path):
+        subdirectories = []
+        files = []
+        with os.scandir(path) as it:
+            for entry in it:
+                # like os.walk, don't follow symlinked directories, which could form a loop
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.name)
+                elif entry.name.endswith(self.extensions):
+                    files.append(entry.name)
+        return subdirectories, files
+
+    def templates(self):
+        templates = []
+        entries = {}
+        pending = ['']
+        trusted_before = time.time_ns() - self.racy_ns
+        while pending:
+            rel_dir = pending.pop()
+            path = os.path.join(self.directory, rel_dir)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                cached = self.entries.get(rel_dir)
+                if cached is not None and cached[0] == mtime and mtime < trusted_before:
+                    _, subdirectories, files = cached
+                else:
+                    subdirectories, files = self._scan(path)
+            except OSError:
+                # removed while we were looking at it
+                continue
+
+            entries[rel_dir] = (mtime, subdirectories, files)
+            templates += [os.path.join(rel_dir, x) for x in files]
+            pending += [os.path.join(rel_dir, x) for x in subdirectories]
+
+        self.entries = entries
         return templates
 
-    for root, _, files in os.walk(directory):
-        for file in files:
-            template_extensions = getattr(
-                settings, "SHOWTEMPLATE_EXTENSIONS", [".html", ".htm", ".django", ".jinja", ".md"]
-            )
-            if file.endswith(tuple(template_extensions)):
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, directory)
-                templates.append(rel_path)
 
-    return templates
+_template_catalogs = {}
+
+
+def with_suggestions(word, possibilities):
+    suggestions = format_suggestions(word, possibilities)
+    return f'\n{suggestions}\n' if suggestions else ''
+
+
+def format_suggestions(word, possibilities):
+    """A "Did you mean?" paragraph for error messages, or '' if nothing is close to `word`."""
+    suggestions = get_close_matches(word, possibilities)
+    if not suggestions:
+        return ''
+    suggestions = '\n    '.join(suggestions)
+    return f'Did you mean?\n\n    {suggestions}'
+
+
+def get_template_files(directory):
+    if not os.path.exists(directory):
+        return []
+
+    extensions = get_template_extensions()
+    catalog = _template_catalogs.get(directory)
+    if catalog is None or catalog.extensions != extensions:
+        catalog = _template_catalogs[directory] = TemplateCatalog(directory, extensions)
+
+    return catalog.templates()
 
 
 def get_loader_templates(loader):
@@ -680,11 +1465,15 @@ def fastdev_template_does_not_exist_error(self):
     if not settings.DEBUG:
         return ''.join(self.args)
 
+    message = getattr(self, '_fastdev_message', None)
+    if message is not None:
+        return message
+
     r = list(self.args)
 
     templates = get_all_templates()
 
-    suggestions = difflib.get_close_matches(self.args[0], templates)
+    suggestions = get_close_matches(self.args[0], templates)
     if suggestions:
         r += ['', 'Did you mean?']
         r += [f'    {x}' for x in suggestions]
@@ -692,44 +1481,199 @@ def fastdev_template_does_not_exist_error(self):
     r += ['', 'Valid values:']
     r += [f'    {x}' for x in templates]
 
-    return '\n'.join(r)
+    # logging, the debug page and test output can all stringify the same exception
+    self._fastdev_message = '\n'.join(r)
+    return self._fastdev_message
 
 
 class InvalidCleanMethod(Exception):
     pass
 
 
-class FastDevNoReverseMatchNamespace(NoReverseMatch):
+class URLNameIndex:
+    """
+    The names and namespaces a URL resolver can reverse. Names and namespaces
+    inside namespaces are included as "namespace:name".
+    """
 
-    def __init__(self, msg):
-        from django.conf import settings
-        if settings.DEBUG:
-            frame = inspect.currentframe().f_back
-            resolver = frame.f_locals['resolver']
+    def __init__(self, resolver):
+        self.names = []
+        self.namespaces = []
+        # everything reverse() accepts, including application namespaces
+        # that stand for an instance namespace
+        self.valid_names = set()
+        self.valid_namespaces = set()
+        # id of the url_patterns of each resolver -> "namespace:" prefix of its names
+        self.prefixes = {}
+        self._add(resolver, [''])
+        self.names.sort()
+        self.namespaces.sort()
+
+        # "name" -> ["name", "namespace:name", ...]
+        self.by_name = {}
+        for name in self.names:
+            self.by_name.setdefault(name.rpartition(':')[2], []).append(name)
+
+    def _add(self, resolver, prefixes):
+        # reverse_dict is also keyed by view callables
+        names = [x for x in resolver.reverse_dict.keys() if isinstance(x, str)]
+        self.names += [prefixes[0] + x for x in names]
+        self.prefixes[id(resolver.url_patterns)] = prefixes[0]
+        self.valid_names.update(prefix + x for prefix in prefixes for x in names)
+
+        app_names = {}
+        for app_name, namespaces in resolver.app_dict.items():
+            if app_name not in resolver.namespace_dict:
+                for namespace in namespaces:
+                    app_names.setdefault(namespace, []).append(app_name)
+
+        for namespace, (_, namespace_resolver) in resolver.namespace_dict.items():
+            self.namespaces.append(prefixes[0] + namespace)
+            namespace_prefixes = [prefix + x for x in [namespace, *app_names.get(namespace, [])] for prefix in prefixes]
+            self.valid_namespaces.update(namespace_prefixes)
+            self._add(namespace_resolver, [f'{x}:' for x in namespace_prefixes])
+
+    def check_name(self, name):
+        """What is wrong with reversing the URL name `name`, or None if it exists."""
+        namespace, _, view_name = name.rpartition(':')
+        if namespace and namespace not in self.valid_namespaces:
+            message = f"'{namespace}' is not a registered namespace"
+            suggestions = format_suggestions(namespace, self.namespaces)
+            if suggestions:
+                message += f'\n\n{suggestions}'
+            return message
+        if name not in self.valid_names:
+            message = f"'{name}' is not a valid URL name"
+            suggestions = self.suggest_names(view_name)
+            if suggestions:
+                suggestions = '\n    '.join(suggestions)
+                message += f'\n\nDid you mean?\n\n    {suggestions}'
+            return message
+        return None
 
-            msg += '\n\nAvailable namespaces:\n    '
-            msg += '\n    '.join(sorted(resolver.namespace_dict.keys()))
+    def names_in(self, resolver):
+        """
+        The names `resolver` can reverse, without their namespace, or None if
+        it isn't part of the index.
+        """
+        prefix = self.prefixes.get(id(resolver.url_patterns))
+        if prefix is None and len(resolver.url_patterns) == 1 and isinstance(resolver.url_patterns[0], URLResolver):
+            # reverse() wraps namespaces in a resolver of their own, see get_ns_resolver()
+            prefix = self.prefixes.get(id(resolver.url_patterns[0].url_patterns))
+        if prefix is None:
+            return None
+        return [x[len(prefix):] for x in self.names if x.startswith(prefix) and ':' not in x[len(prefix):]]
+
+    def suggest_names(self, name):
+        """Close matches for `name`, in any namespace."""
+        return [
+            qualified_name
+            for x in get_close_matches(name, list(self.by_name))
+            for qualified_name in self.by_name[x]
+        ]
+
+
+# A new resolver is created when the urlconf changes (clear_url_caches()), so
+# keying on the resolver is enough to keep the index up to date.
+_url_name_indexes = WeakKeyDictionary()
+
+
+def get_url_name_index(resolver=None):
+    if resolver is None:
+        resolver = get_resolver(get_urlconf())
+    index = _url_name_indexes.get(resolver)
+    if index is None:
+        index = _url_name_indexes[resolver] = URLNameIndex(resolver)
+    return index
+
+
+def url_names_can_be_checked():
+    """
+    If the names in {% url %} tags can be checked when a template is compiled.
+    They're left to rendering when the current urlconf isn't the one the
+    template is rendered with later, or isn't done importing yet.
+    """
+    # set per request with request.urlconf
+    if get_urlconf() is not None:
+        return False
+    # a template compiled while the urlconf imports its views would import it again
+    urlconf = getattr(settings, 'ROOT_URLCONF', None)
+    return isinstance(urlconf, str) and hasattr(sys.modules.get(urlconf), 'urlpatterns')
 
-        super().__init__(msg)
+
+def validate_url_node(url_node):
+    """Raise TemplateSyntaxError if the literal name of a {% url %} can't be reversed."""
+    # {% url "name" as var %} is allowed to fail
+    if url_node.asvar:
+        return
+    name = get_static_name(url_node.view_name)
+    if name is None:
+        return
+    problem = get_url_name_index().check_name(name)
+    if problem is not None:
+        raise TemplateSyntaxError(f'Invalid {{% url %}}: {problem}')
 
 
-class FastDevNoReverseMatch(NoReverseMatch):
+class FastDevNoReverseMatchBase(NoReverseMatch):
+    """
+    The message, with the names from the URL index, is built the first time
+    the exception is turned into a string, so code that catches
+    NoReverseMatch to leave out optional links doesn't pay for it.
+    """
 
     def __init__(self, msg):
-        from django.conf import settings
-        if settings.DEBUG:
-            frame = inspect.currentframe().f_back
+        super().__init__(msg)
+        self.msg = msg
+        self.message = None
+        # reverse() uses the urlconf of the current request, which is gone by the time the message is built
+        self.resolver = get_resolver(get_urlconf()) if settings.DEBUG else None
+
+    def __str__(self):
+        if self.message is not None:
+            return self.message
+        if self.resolver is None:
+            return self.msg
+        self.message = self.format_message(get_url_name_index(self.resolver))
+        return self.message
 
-            msg += '\n\nThese names exist:\n\n    '
+    def __reduce__(self):
+        # Resolvers can't be pickled, as the parallel test runner does with failures, so keep the message instead
+        return type(self), (self.msg,), {'message': str(self), 'resolver': None}
 
-            names = []
 
-            resolver = frame.f_locals['self']
-            for k in resolver.reverse_dict.keys():
-                if callable(k):
-                    continue
-                names.append(k)
+class FastDevNoReverseMatchNamespace(FastDevNoReverseMatchBase):
 
-            msg += '\n    '.join(sorted(names))
+    def format_message(self, index):
+        msg = self.msg + '\n\nAvailable namespaces:\n    '
+        msg += '\n    '.join(index.namespaces)
 
+        # "'ns' is not a registered namespace inside 'outer:inner'"
+        m = re.match(r"'(.*)' is not a registered namespace(?: inside '(.*)')?$", self.msg)
+        if m:
+            namespace, inside = m.groups()
+            suggestions = format_suggestions(f'{inside}:{namespace}' if inside else namespace, index.namespaces)
+            if suggestions:
+                msg += f'\n\n{suggestions}'
+        return msg
+
+
+class FastDevNoReverseMatch(FastDevNoReverseMatchBase):
+
+    def __init__(self, msg):
         super().__init__(msg)
+        # the resolver of the namespace that was reversed in, set by the reverse_errors feature
+        self.raised_by = None
+
+    def format_message(self, index):
+        names = index.names_in(self.raised_by) if self.raised_by is not None else None
+        msg = self.msg + '\n\nThese names exist:\n\n    '
+        msg += '\n    '.join(names if names is not None else index.names)
+
+        # "Reverse for 'name' with arguments ..." means the name exists, but the arguments are wrong
+        m = re.match(r"Reverse for '(.*)' not found\. ", self.msg)
+        if m:
+            suggestions = index.suggest_names(m.group(1))
+            if suggestions:
+                suggestions = '\n    '.join(suggestions)
+                msg += f'\n\nDid you mean?\n\n    {suggestions}'
+        return msg
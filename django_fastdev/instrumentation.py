@@ -0,0 +1,98 @@
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+
+logger = logging.getLogger('django_fastdev')
+
+
+def instrumentation_enabled():
+    return getattr(settings, 'FASTDEV_INSTRUMENTATION', False)
+
+
+class Stats:
+    """
+    Number of calls and cumulative time per fastdev patch.
+
+    The time of a patch includes the Django code it wraps, and the time of
+    other patches called from it (like resolve_override inside
+    if_render_override).
+    """
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+
+    def add(self, name, seconds):
+        self.calls[name] += 1
+        self.seconds[name] += seconds
+
+    def merge(self, other):
+        for name, calls in other.calls.items():
+            self.calls[name] += calls
+            self.seconds[name] += other.seconds[name]
+
+    def clear(self):
+        self.calls.clear()
+        self.seconds.clear()
+
+    def format(self):
+        if not self.calls:
+            return '    (no calls)'
+        width = max(len(name) for name in self.calls)
+        return '\n'.join(
+            f'    {name:<{width}}  {self.calls[name]:>8} calls  {self.seconds[name] * 1000:>10.2f} ms'
+            for name in sorted(self.calls, key=lambda name: -self.seconds[name])
+        )
+
+
+# Everything since the process started, or since totals.clear()
+totals = Stats()
+
+_current = ContextVar('fastdev_stats', default=totals)
+
+
+def instrument(name, func):
+    """Wrap `func` so its calls and time are counted under `name`."""
+    @wraps(func)
+    def instrumented(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.get().add(name, perf_counter() - start)
+
+    return instrumented
+
+
+@contextmanager
+def collect_stats():
+    """Collect the stats of the code in the block separately. They are added to `totals` afterwards."""
+    stats = Stats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        totals.merge(stats)
+
+
+class InstrumentationMiddleware:
+    """
+    Logs a summary of the time spent in fastdev patches for each request to
+    the `django_fastdev` logger, and stores it as `request.fastdev_stats`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_stats() as stats:
+            response = self.get_response(request)
+        request.fastdev_stats = stats
+        logger.info('django-fastdev time for %s %s:\n%s', request.method, request.path, stats.format())
+        return response
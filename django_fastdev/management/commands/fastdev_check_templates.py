@@ -0,0 +1,39 @@
+from textwrap import indent
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from django_fastdev.template_analysis import check_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Parse every template of the project, and report invalid blocks, thrown away html, '
+        'extends or includes of templates that do not exist, and url names that do not exist, '
+        'without rendering anything.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, help='number of processes to parse templates in (default one per CPU)')
+
+    def handle(self, *args, jobs, verbosity, **options):
+        results = check_templates(jobs=jobs)
+
+        problem_count = 0
+        for analysis, problems in results:
+            if problems:
+                self.stdout.write(f'{analysis.name} ({analysis.origin_name})')
+                for problem in problems:
+                    self.stdout.write(indent(problem, '    ') + '\n')
+                problem_count += len(problems)
+            elif verbosity >= 2:
+                self.stdout.write(f'{analysis.name}: OK')
+
+            if verbosity >= 2 and analysis.variables:
+                self.stdout.write('    variables: ' + ', '.join(sorted(analysis.variables)))
+
+        if problem_count:
+            raise CommandError(f'Found {problem_count} problems in {len(results)} templates')
+        self.stdout.write(f'Checked {len(results)} templates, no problems found')
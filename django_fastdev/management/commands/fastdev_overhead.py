@@ -0,0 +1,71 @@
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import (
+    Client,
+    override_settings,
+)
+
+from django_fastdev.apps import features
+from django_fastdev.instrumentation import collect_stats
+
+
+def reinstall(installed_features):
+    for feature in installed_features:
+        feature.uninstall()
+        feature.install()
+
+
+class Command(BaseCommand):
+    help = (
+        'Request the given paths in-process, and report the calls and time in each django-fastdev patch, '
+        'and the total time compared to the same requests with the patches uninstalled.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='paths to request, like /admin/')
+        parser.add_argument('--repeat', type=int, default=10, help='number of requests per path and mode (default 10)')
+
+    def time_requests(self, client, path, repeat):
+        start = perf_counter()
+        for _ in range(repeat):
+            response = client.get(path)
+        return perf_counter() - start, response.status_code
+
+    def handle(self, *args, paths, repeat, **options):
+        # Only features with patches, reinstalling the startup checks would run them again
+        installed_features = [x for x in features.values() if x.installed and x.originals]
+        client = Client()
+
+        with override_settings(FASTDEV_INSTRUMENTATION=True, ALLOWED_HOSTS=['testserver', *settings.ALLOWED_HOSTS]):
+            reinstall(installed_features)
+            try:
+                for path in paths:
+                    client.get(path)  # warm up template and url caches
+                    with collect_stats() as stats:
+                        fastdev_seconds, status_code = self.time_requests(client, path, repeat)
+
+                    for feature in installed_features:
+                        feature.uninstall()
+                    try:
+                        client.get(path)
+                        stock_seconds, _ = self.time_requests(client, path, repeat)
+                    finally:
+                        for feature in installed_features:
+                            feature.install()
+
+                    self.stdout.write(f'{path} (status {status_code}, {repeat} requests)\n')
+                    self.stdout.write(stats.format() + '\n')
+                    self.stdout.write(
+                        f'    with fastdev: {fastdev_seconds * 1000 / repeat:.2f} ms per request, '
+                        f'without: {stock_seconds * 1000 / repeat:.2f} ms per request, '
+                        f'overhead: {(fastdev_seconds - stock_seconds) * 1000 / repeat:.2f} ms\n\n'
+                    )
+            finally:
+                for feature in installed_features:
+                    feature.uninstall()
+
+        # outside of override_settings, so the patches are installed without instrumentation again
+        for feature in installed_features:
+            feature.install()
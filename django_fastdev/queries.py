@@ -0,0 +1,488 @@
+import logging
+import re
+import sys
+from contextlib import (
+    ExitStack,
+    contextmanager,
+)
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import (
+    FieldDoesNotExist,
+    ImproperlyConfigured,
+    MiddlewareNotUsed,
+)
+from django.db import connections
+from django.db.models import Q
+from django.template.base import (
+    UNKNOWN_SOURCE,
+    Node,
+    TokenType,
+    Variable,
+)
+from django.template.defaulttags import ForNode
+
+logger = logging.getLogger('django_fastdev')
+
+
+def get_report_mode(setting_name, default=False):
+    """
+    How to report a problem, from a setting that is 'raise', 'warn', or
+    False to not look for the problem at all. True is the same as 'raise'.
+    """
+    value = getattr(settings, setting_name, default)
+    if value is True:
+        return 'raise'
+    if not value:
+        return None
+    if value not in ('raise', 'warn'):
+        raise ImproperlyConfigured(f"{setting_name} must be 'raise', 'warn' or False, not {value!r}")
+    return value
+
+
+def report(mode, exception):
+    if mode == 'raise':
+        raise exception
+    logger.warning('%s', exception)
+
+
+class NPlusOneQueries(Exception):
+    pass
+
+
+def n_plus_one_mode():
+    return get_report_mode('FASTDEV_N_PLUS_ONE_QUERIES')
+
+
+def n_plus_one_threshold():
+    return getattr(settings, 'FASTDEV_N_PLUS_ONE_THRESHOLD', 3)
+
+
+def sql_shape(sql):
+    # The parameters are passed separately, only the length of IN lists varies
+    return re.sub(r'%s(, %s)+', '%s, ...', sql)
+
+
+def format_token(token):
+    if token.token_type == TokenType.VAR:
+        return f'{{{{ {token.contents} }}}}'
+    return f'{{% {token.contents} %}}'
+
+
+def get_relation(model, name):
+    """The relation field of `model` that is accessed as `name` on instances, or None."""
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        # reverse relations are accessed as book_set, or their related_name
+        accessor = field.get_accessor_name() if field.auto_created and not field.concrete else field.name
+        if accessor == name:
+            return field
+    return None
+
+
+def relation_path(lookups, loop):
+    """
+    The lookups of a variable, relative to the loop variable of `loop`, like
+    ['author', 'publisher'] for book.author.publisher in {% for book in books %}.
+    """
+    if lookups[0] in loop.loopvars:
+        return list(lookups[1:])
+    return None
+
+
+class QueryTrigger:
+    """Where in a template a query was run: the node, the enclosing loop, and a suggested fix."""
+
+    def __init__(self, node, loop, suggestion):
+        self.node = node
+        self.loop = loop
+        self.suggestion = suggestion
+        self.key = (node.origin.name if node.origin else None, node.token.lineno, node.token.contents, loop.token.contents)
+
+    def describe(self):
+        origin = self.node.origin
+        template_name = (origin.template_name or origin.name) if origin else UNKNOWN_SOURCE
+        return f'{format_token(self.node.token)} in {template_name}, line {self.node.token.lineno},'
+
+
+def suggest_for_lookup(variable, current, bit, loop):
+    path = relation_path(variable.lookups, loop)
+    if path is None or bit not in path:
+        return None
+    path = path[:path.index(bit) + 1]
+
+    if callable(current) and hasattr(current, '__self__'):
+        # the query runs when _resolve_lookup calls the method it looked up
+        current = current.__self__
+
+    model = getattr(current, 'model', None)
+    if model is not None:
+        # a method on a related manager, like book.tags.count
+        path = path[:-1]
+        return f".prefetch_related('{'__'.join(path)}')" if path else None
+
+    relation = get_relation(type(current), bit) if hasattr(type(current), '_meta') else None
+    if relation is None:
+        return None
+    if relation.many_to_one or relation.one_to_one:
+        return f".select_related('{'__'.join(path)}')"
+    return f".prefetch_related('{'__'.join(path)}')"
+
+
+def suggest_for_loop(inner_loop, loop):
+    # {% for tag in book.tags.all %} inside {% for book in books %}
+    variable = inner_loop.sequence.var
+    if not isinstance(variable, Variable) or variable.lookups is None:
+        return None
+    path = relation_path(variable.lookups, loop)
+    if path and path[-1] == 'all':
+        path = path[:-1]
+    return f".prefetch_related('{'__'.join(path)}')" if path else None
+
+
+def inspect_template_stack(frame):
+    """
+    The innermost Variable lookup, the innermost template node with a
+    token, and the {% for %} loops, innermost first, on the stack from
+    `frame` up.
+    """
+    lookup = None
+    node = None
+    loops = []
+
+    while frame is not None:
+        code_name = frame.f_code.co_name
+        if code_name in ('render', 'render_annotated', '_resolve_lookup'):
+            obj = frame.f_locals.get('self')
+            if code_name == '_resolve_lookup' and isinstance(obj, Variable):
+                if lookup is None:
+                    lookup = (obj, frame.f_locals.get('current'), frame.f_locals.get('bit'))
+            elif isinstance(obj, Node) and getattr(obj, 'token', None) is not None:
+                if node is None:
+                    node = obj
+                if isinstance(obj, ForNode) and obj not in loops:
+                    loops.append(obj)
+        frame = frame.f_back
+
+    return lookup, node, loops
+
+
+def find_trigger():
+    """
+    The template node that is running the current query, if it's inside a
+    {% for %}. Only called for queries while the detector is on, so it can
+    afford to look at the stack.
+    """
+    lookup, node, loops = inspect_template_stack(sys._getframe(2))
+
+    # a loop evaluating its own sequence runs once per iteration of the enclosing loop
+    loops = [x for x in loops if x is not node]
+    if node is None or not loops:
+        return None
+
+    loop = loops[0]
+    if lookup is not None:
+        suggestion = suggest_for_lookup(*lookup, loop)
+    elif isinstance(node, ForNode):
+        suggestion = suggest_for_loop(node, loop)
+    else:
+        suggestion = None
+    return QueryTrigger(node, loop, suggestion)
+
+
+class QueryGroup:
+    def __init__(self, trigger, sql):
+        self.trigger = trigger
+        self.sql = sql
+        self.count = 0
+
+    def format(self):
+        message = (
+            f'{self.trigger.describe()} ran the same query {self.count} times '
+            f'inside {format_token(self.trigger.loop.token)}:\n\n    {self.sql}'
+        )
+        if self.trigger.suggestion:
+            message += f'\n\nUse {self.trigger.suggestion} on the queryset of {format_token(self.trigger.loop.token)}.'
+        else:
+            message += '\n\nUse select_related() or prefetch_related() on the queryset of the loop.'
+        return message
+
+
+class TemplateQueryTracker:
+    """
+    A database execute wrapper that groups the queries run while a template
+    renders by the node that ran them and the shape of the SQL.
+    """
+
+    def __init__(self):
+        self.groups = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        trigger = find_trigger()
+        if trigger is not None:
+            shape = sql_shape(sql)
+            key = (trigger.key, shape)
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = QueryGroup(trigger, shape)
+            group.count += 1
+        return execute(sql, params, many, context)
+
+    def problems(self, threshold):
+        return [x for x in self.groups.values() if x.count >= threshold]
+
+
+class DeferredFieldAccess(Exception):
+    pass
+
+
+def deferred_fields_mode():
+    return get_report_mode('FASTDEV_DEFERRED_FIELDS')
+
+
+class DeferredFieldLoads:
+    def __init__(self, template_name, model, field_name, node):
+        self.template_name = template_name
+        self.model = model
+        self.field_name = field_name
+        # the first node that loaded the field
+        self.node = node
+        self.count = 0
+
+    def format(self):
+        times = 'once' if self.count == 1 else f'{self.count} times'
+        return (
+            f'{self.template_name}: {self.model.__name__}.{self.field_name} is deferred, and was loaded '
+            f'{times}, first by {format_token(self.node.token)} on line {self.node.token.lineno}. '
+            f'Remove it from .only()/.defer() in the view, or stop using it in the template.'
+        )
+
+
+class DeferredFieldTracker:
+    """Deferred fields loaded while a template renders, by template, model and field."""
+
+    def __init__(self):
+        self.loads = {}
+
+    def add(self, instance, field_name):
+        _, node, _ = inspect_template_stack(sys._getframe(2))
+        if node is None:
+            # loaded by Python code called from the template, like a model method
+            return
+        origin = node.origin
+        template_name = (origin.template_name or origin.name) if origin else UNKNOWN_SOURCE
+        key = (template_name, type(instance), field_name)
+        loads = self.loads.get(key)
+        if loads is None:
+            loads = self.loads[key] = DeferredFieldLoads(template_name, type(instance), field_name, node)
+        loads.count += 1
+
+
+class RenderTrackers:
+    def __init__(self, queries, deferred_fields):
+        self.queries = queries
+        self.deferred_fields = deferred_fields
+
+
+# Set while the outermost template renders
+current_render_trackers = ContextVar('fastdev_render_trackers', default=None)
+
+
+def render_tracking_queries(render, template, context, n_plus_one, deferred_fields):
+    """
+    Render `template`, and report N+1 queries and deferred field loads once
+    the outermost template is done. `n_plus_one` and `deferred_fields` are
+    the report modes, None to not track them.
+    """
+    if (n_plus_one is None and deferred_fields is None) or current_render_trackers.get() is not None:
+        return render(template, context)
+
+    trackers = RenderTrackers(
+        queries=TemplateQueryTracker() if n_plus_one else None,
+        deferred_fields=DeferredFieldTracker() if deferred_fields else None,
+    )
+    token = current_render_trackers.set(trackers)
+    try:
+        with ExitStack() as stack:
+            if trackers.queries is not None:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(trackers.queries))
+            result = render(template, context)
+    finally:
+        current_render_trackers.reset(token)
+
+    if trackers.deferred_fields is not None and trackers.deferred_fields.loads:
+        loads = '\n\n'.join(x.format() for x in trackers.deferred_fields.loads.values())
+        report(deferred_fields, DeferredFieldAccess(f'Deferred fields loaded while rendering:\n\n{loads}'))
+
+    if trackers.queries is not None:
+        problems = trackers.queries.problems(n_plus_one_threshold())
+        if problems:
+            report(n_plus_one, NPlusOneQueries('N+1 queries while rendering:\n\n' + '\n\n'.join(x.format() for x in problems)))
+    return result
+
+
+def track_deferred_field(instance, field_name):
+    """Called by the DeferredAttribute patch before a deferred field is loaded."""
+    trackers = current_render_trackers.get()
+    if trackers is not None and trackers.deferred_fields is not None and field_name in instance.get_deferred_fields():
+        trackers.deferred_fields.add(instance, field_name)
+
+
+class RepeatedGetQueries(Exception):
+    pass
+
+
+def repeated_get_mode():
+    # Tracking is turned on with RepeatedGetMiddleware or track_repeated_gets(), so this defaults to on
+    return get_report_mode('FASTDEV_REPEATED_GET_QUERIES', default='warn')
+
+
+def repeated_get_threshold():
+    return getattr(settings, 'FASTDEV_REPEATED_GET_THRESHOLD', 10)
+
+
+def iter_q_keys(q):
+    for child in q.children:
+        if isinstance(child, Q):
+            yield from iter_q_keys(child)
+        else:
+            yield child[0]
+
+
+def get_filter_keys(args, kwargs):
+    """The field lookups of a .get() call, without the values: the shape of the query."""
+    keys = set(kwargs)
+    for arg in args:
+        if isinstance(arg, Q):
+            keys.update(iter_q_keys(arg))
+    return tuple(sorted(keys))
+
+
+class RepeatedGetTracker:
+    """
+    Counts QuerySet.get() calls by model and filter keys. At most
+    `max_shapes` different shapes are counted, so a long running block
+    with many different queries can't use up memory.
+
+    Related objects loaded through a foreign key are counted by model
+    alone, with None for the keys.
+    """
+    max_shapes = 1000
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, model, args, kwargs, through_relation=False):
+        key = (model, None if through_relation else get_filter_keys(args, kwargs))
+        count = self.counts.get(key)
+        if count is None:
+            if len(self.counts) >= self.max_shapes:
+                return
+            count = 0
+        self.counts[key] = count + 1
+
+    def problems(self, threshold):
+        return [(model, keys, count) for (model, keys), count in self.counts.items() if count >= threshold]
+
+
+def called_through_relation(frame):
+    """
+    True if the .get() call from `frame` was made by a related object
+    descriptor, like `book.author` loading the author.
+    """
+    # skip the fastdev patches, and the instrumentation wrapped around them
+    while frame is not None and frame.f_globals.get('__name__', '').startswith('django_fastdev.'):
+        frame = frame.f_back
+    return frame is not None and frame.f_globals.get('__name__') == 'django.db.models.fields.related_descriptors'
+
+
+def suggest_bulk_query(model, keys):
+    name = model.__name__
+    if len(keys) != 1:
+        return f'one {name}.objects.filter() for all of them, and a dict to look them up in'
+
+    key = keys[0]
+    if key in ('pk', model._meta.pk.name):
+        return f'{name}.objects.in_bulk(ids)'
+    try:
+        field = model._meta.get_field(key)
+    except FieldDoesNotExist:
+        # a lookup like name__iexact, or a path through a relation
+        return f'one {name}.objects.filter() for all of them, and a dict to look them up in'
+    if field.unique:
+        return f"{name}.objects.in_bulk(values, field_name='{key}')"
+    return f'{name}.objects.filter({key}__in=values)'
+
+
+def format_repeated_get(model, keys, count):
+    if keys is None:
+        return (
+            f'{model.__name__} objects were loaded through a relation {count} times, one query each. '
+            f'Load them along with the objects that refer to them, with select_related() or prefetch_related()'
+        )
+    arguments = ', '.join(f'{x}=...' for x in keys)
+    return (
+        f'{model.__name__}.objects.get({arguments}) was called {count} times. '
+        f'Fetch them with one query, like {suggest_bulk_query(model, keys)}'
+    )
+
+
+# Set while tracking, read by the QuerySet.get() patch
+current_get_tracker = ContextVar('fastdev_get_tracker', default=None)
+
+
+@contextmanager
+def track_repeated_gets(description='this block'):
+    """
+    Count the QuerySet.get() calls in the block, and report the ones with
+    the same model and filter keys that happen FASTDEV_REPEATED_GET_THRESHOLD
+    times or more.
+    """
+    mode = repeated_get_mode()
+    if mode is None:
+        yield None
+        return
+
+    if not repeated_gets_can_be_tracked():
+        logger.warning('QuerySet.get() calls are not tracked in %s: the queryset_get_errors feature of django-fastdev is turned off', description)
+        yield None
+        return
+
+    tracker = RepeatedGetTracker()
+    token = current_get_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        current_get_tracker.reset(token)
+
+    problems = tracker.problems(repeated_get_threshold())
+    if problems:
+        problems = '\n\n'.join(format_repeated_get(*x) for x in sorted(problems, key=lambda x: -x[2]))
+        report(mode, RepeatedGetQueries(f'Repeated QuerySet.get() calls in {description}:\n\n{problems}'))
+
+
+def repeated_gets_can_be_tracked():
+    from django_fastdev.apps import features
+
+    # the counting is done by the QuerySet.get() patch of this feature
+    return features['queryset_get_errors'].installed
+
+
+class RepeatedGetMiddleware:
+    """Reports QuerySet.get() calls that are repeated with the same model and filter keys within a request."""
+
+    def __init__(self, get_response):
+        from django_fastdev.apps import fastdev_enabled
+
+        if not repeated_gets_can_be_tracked():
+            if fastdev_enabled():
+                logger.warning('RepeatedGetMiddleware is not used: the queryset_get_errors feature of django-fastdev is turned off')
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_repeated_gets(f'{request.method} {request.path}'):
+            return self.get_response(request)
@@ -0,0 +1,89 @@
+from collections import defaultdict
+from functools import lru_cache
+
+
+def trigrams(s):
+    s = f'  {s.lower()} '
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def bounded_edit_distance(a, b, bound):
+    """
+    Levenshtein distance between `a` and `b`, or `bound + 1` as soon as it's
+    clear the distance is larger than `bound`.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, start=1):
+        current = [i]
+        for j, y in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (x != y),
+            ))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1]
+
+
+class SuggestionIndex:
+    """
+    A trigram index over a list of names, for "Did you mean?" suggestions.
+
+    Only names that share trigrams with the word are considered, and the best
+    of those are ranked by edit distance, so a lookup is cheap even for very
+    large lists of names.
+    """
+
+    # How many of the names with the most trigrams in common get ranked by edit distance
+    max_candidates = 50
+
+    def __init__(self, names):
+        self.names = list(dict.fromkeys(names))
+        self.index = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in trigrams(name):
+                self.index[gram].append(i)
+
+    def get_close_matches(self, word, n=3, cutoff=0.6):
+        """
+        Like `difflib.get_close_matches`: at most `n` names, best first, with a
+        similarity of at least `cutoff`. Similarity is one minus the edit
+        distance divided by the length of the longer string.
+        """
+        counts = defaultdict(int)
+        for gram in trigrams(word):
+            for i in self.index.get(gram, ()):
+                counts[i] += 1
+
+        candidates = sorted(counts, key=lambda i: -counts[i])[:self.max_candidates]
+
+        scored = []
+        for i in candidates:
+            name = self.names[i]
+            length = max(len(word), len(name))
+            bound = int((1 - cutoff) * length)
+            distance = bounded_edit_distance(word, name, bound)
+            if distance <= bound:
+                scored.append((distance / length, name))
+
+        return [name for _, name in sorted(scored)[:n]]
+
+
+@lru_cache(maxsize=16)
+def _get_suggestion_index(names):
+    return SuggestionIndex(names)
+
+
+def get_close_matches(word, possibilities, n=3, cutoff=0.6):
+    """
+    A drop-in replacement for `difflib.get_close_matches`. The index for a
+    given list of possibilities is built once and reused.
+    """
+    if not word or not possibilities:
+        return []
+    return _get_suggestion_index(tuple(possibilities)).get_close_matches(str(word), n=n, cutoff=cutoff)
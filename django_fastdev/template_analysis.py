@@ -0,0 +1,315 @@
+"""
+Static checks of template source, without rendering anything.
+
+Every template is parsed once into a `TemplateAnalysis`: the variables it
+looks up, the blocks it defines and overrides, what it extends and
+includes. The analyses are then checked against each other, so problems
+that normally only show up when a page is rendered (a misspelled block
+name, an extends or include of a template that doesn't exist) can be
+found for the whole project at once.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.template import (
+    TemplateDoesNotExist,
+    engines,
+)
+from django.template.backends.django import DjangoTemplates
+from django.template.base import (
+    DebugLexer,
+    FilterExpression,
+    Lexer,
+    Node,
+    NodeList,
+    Parser,
+    TextNode,
+    Variable,
+)
+from django.template.defaulttags import (
+    URLNode,
+    url,
+)
+from django.template.loader_tags import (
+    BlockNode,
+    ExtendsNode,
+    IncludeNode,
+)
+
+from django_fastdev.apps import (
+    format_suggestions,
+    get_all_templates,
+    get_static_name,
+    get_url_name_index,
+    has_static_parent,
+    is_template_origin_from_project,
+    template_is_ignored,
+)
+
+# Starting worker processes costs more than parsing this many templates
+PARALLEL_THRESHOLD = 100
+
+
+class TemplateAnalysis:
+    """What a template looks up, defines and refers to, from its source alone."""
+
+    def __init__(self, name, origin_name):
+        self.name = name
+        self.origin_name = origin_name
+        # the TemplateSyntaxError message, if the template doesn't compile
+        self.error = None
+        # name of the parent template, for {% extends "literal.html" %}
+        self.extends = None
+        self.dynamic_extends = False
+        # blocks directly inside {% extends %}, overriding the parent
+        self.overridden_blocks = set()
+        # every block in the template, at any depth
+        self.blocks = set()
+        self.includes = set()
+        # literal names of {% url %} tags without "as var"
+        self.url_names = set()
+        self.variables = set()
+        self.thrown_away_text = []
+
+
+def find_template_source(name):
+    """The engine, origin and source of the template `name` would load, or None."""
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        for loader in engine.template_loaders:
+            for origin in loader.get_template_sources(name):
+                try:
+                    return engine, origin, origin.loader.get_contents(origin)
+                except TemplateDoesNotExist:
+                    continue
+    return None
+
+
+def iter_nodes(nodelist):
+    for node in nodelist:
+        yield node
+        for child_nodelist_name in node.child_nodelists:
+            yield from iter_nodes(getattr(node, child_nodelist_name, None) or [])
+
+
+def iter_filter_expressions(obj, depth=0):
+    """
+    The FilterExpressions in the attributes of a node, including those inside
+    {% if %} conditions and the arguments of tags like {% with %} and {% url %}.
+    Child nodes are not included.
+    """
+    if isinstance(obj, FilterExpression):
+        yield obj
+    elif isinstance(obj, (Node, NodeList)) or depth > 4:
+        return
+    elif isinstance(obj, (list, tuple)):
+        for x in obj:
+            yield from iter_filter_expressions(x, depth + 1)
+    elif isinstance(obj, dict):
+        for x in obj.values():
+            yield from iter_filter_expressions(x, depth + 1)
+    elif type(obj).__module__.startswith('django.template') and hasattr(obj, '__dict__'):
+        # if conditions: TemplateLiteral and the smartif operators
+        for x in vars(obj).values():
+            yield from iter_filter_expressions(x, depth + 1)
+
+
+def iter_variable_lookups(filter_expression):
+    variables = [filter_expression.var]
+    for _, args in filter_expression.filters:
+        variables += [arg for is_literal, arg in args if not is_literal]
+    for x in variables:
+        # True, False and None are in the builtins of every Context
+        if isinstance(x, Variable) and x.lookups is not None and x.var not in ('True', 'False', 'None'):
+            yield x.var
+
+
+def analyze_template(name):
+    """Parse the template `name` into a TemplateAnalysis, or None if it can't be found."""
+    found = find_template_source(name)
+    if found is None:
+        return None
+    engine, origin, source = found
+
+    result = TemplateAnalysis(name, origin.name)
+    lexer_class = DebugLexer if engine.debug else Lexer
+    try:
+        # Parse without creating a Template, which would load and validate the parents too
+        parser = Parser(lexer_class(source).tokenize(), engine.template_libraries, engine.template_builtins, origin)
+        # The url names are checked by TemplateChecker, a bad one shouldn't stop the rest of the analysis
+        parser.tags['url'] = url
+        nodelist = parser.parse()
+    except Exception as e:
+        result.error = f'{type(e).__name__}: {e}'
+        return result
+
+    for node in iter_nodes(nodelist):
+        for filter_expression in iter_filter_expressions(vars(node)):
+            result.variables.update(iter_variable_lookups(filter_expression))
+
+        if isinstance(node, BlockNode):
+            result.blocks.add(node.name)
+        elif isinstance(node, IncludeNode) and isinstance(node.template, FilterExpression):
+            include = get_static_name(node.template)
+            if include is not None:
+                result.includes.add(include)
+        elif isinstance(node, URLNode) and not node.asvar:
+            url_name = get_static_name(node.view_name)
+            if url_name is not None:
+                result.url_names.add(url_name)
+
+    extends_node = next((x for x in nodelist if not isinstance(x, TextNode)), None)
+    if isinstance(extends_node, ExtendsNode):
+        if has_static_parent(extends_node):
+            result.extends = str(extends_node.parent_name.var)
+        else:
+            result.dynamic_extends = True
+        result.overridden_blocks = {x.name for x in extends_node.nodelist if isinstance(x, BlockNode)}
+        result.thrown_away_text = [x.s.strip() for x in extends_node.nodelist if isinstance(x, TextNode) and x.s.strip()]
+
+    return result
+
+
+# The settings that decide which templates are found and how they're checked
+WORKER_SETTINGS = ['INSTALLED_APPS', 'TEMPLATES', 'BASE_DIR', 'ROOT_DIR', 'ROOT_URLCONF', 'FASTDEV_IGNORED_TEMPLATES']
+
+
+def setup_worker(settings_module, worker_settings):
+    if not apps.ready:
+        # Worker processes that are spawned rather than forked start from
+        # scratch, without the settings changed after startup, like in tests
+        if settings_module:
+            os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+        for name, value in worker_settings.items():
+            setattr(settings, name, value)
+        django.setup()
+
+
+def analyze_templates(names, jobs=None):
+    """Analyze the templates in `names`, in parallel over `jobs` processes (default one per CPU)."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(names) < PARALLEL_THRESHOLD:
+        return [analyze_template(x) for x in names]
+
+    worker_settings = {name: getattr(settings, name) for name in WORKER_SETTINGS if hasattr(settings, name)}
+    initargs = (getattr(settings, 'SETTINGS_MODULE', None), worker_settings)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=setup_worker, initargs=initargs) as executor:
+        return list(executor.map(analyze_template, names, chunksize=max(1, len(names) // (jobs * 4))))
+
+
+class TemplateChecker:
+    """Checks analyses against each other, loading more as templates outside of the list are referred to."""
+
+    def __init__(self, analyses, names):
+        self.names = names
+        self.analyses = {x.name: x for x in analyses if x is not None}
+        self._valid_blocks = {}
+
+    def get_analysis(self, name):
+        if name not in self.analyses:
+            self.analyses[name] = analyze_template(name)
+        return self.analyses[name]
+
+    def get_chain(self, analysis):
+        """The analyses of all templates `analysis` extends, nearest first, stopping at a loop or a missing template."""
+        chain = []
+        seen = {analysis.origin_name}
+        while analysis.extends is not None:
+            analysis = self.get_analysis(analysis.extends)
+            if analysis is None or analysis.origin_name in seen:
+                break
+            seen.add(analysis.origin_name)
+            chain.append(analysis)
+        return chain
+
+    def get_valid_blocks(self, analysis):
+        """All block names that can be overridden when extending `analysis`, or None if that can't be known statically."""
+        if analysis.name not in self._valid_blocks:
+            result = set(analysis.blocks)
+            current = analysis
+            for parent in self.get_chain(analysis):
+                if parent.error is not None:
+                    result = None
+                    break
+                result |= parent.blocks
+                current = parent
+            if result is not None and (current.dynamic_extends or current.extends is not None):
+                # the chain ends in {% extends var %}, a missing template or a loop
+                result = None
+            self._valid_blocks[analysis.name] = result
+        return self._valid_blocks[analysis.name]
+
+    def missing_template(self, tag, name):
+        message = f'{tag} "{name}", which does not exist'
+        suggestions = format_suggestions(name, self.names)
+        if suggestions:
+            message += '\n\n' + suggestions
+        return message
+
+    def check(self, analysis):
+        """The problems in the template `analysis`, as a list of messages."""
+        if analysis.error is not None:
+            return [analysis.error]
+
+        problems = []
+        # {% extends "self.html" %} in self.html extends the template of the same name in the next directory
+        if analysis.extends is not None and analysis.extends != analysis.name:
+            parent = self.get_analysis(analysis.extends)
+            if parent is None:
+                problems.append(self.missing_template('extends', analysis.extends))
+            elif parent.error is not None:
+                problems.append(f'extends "{analysis.extends}", which does not compile: {parent.error}')
+            elif parent.origin_name == analysis.origin_name or any(x.origin_name == analysis.origin_name for x in self.get_chain(parent)):
+                problems.append(f'extends "{analysis.extends}", which extends this template again')
+            else:
+                valid_blocks = self.get_valid_blocks(parent)
+                invalid_blocks = analysis.overridden_blocks - (valid_blocks or set())
+                if valid_blocks is not None and invalid_blocks:
+                    invalid_names = '    ' + '\n    '.join(sorted(invalid_blocks))
+                    valid_names = '    ' + '\n    '.join(sorted(valid_blocks))
+                    problems.append(f'Invalid blocks specified:\n\n{invalid_names}\n\nValid blocks:\n\n{valid_names}')
+
+        if analysis.thrown_away_text:
+            thrown_away_text = '\n    '.join(repr(x) for x in analysis.thrown_away_text)
+            problems.append(f'The following html is thrown away when rendering:\n\n    {thrown_away_text}')
+
+        for include in sorted(analysis.includes):
+            if self.get_analysis(include) is None:
+                problems.append(self.missing_template('includes', include))
+
+        url_name_index = get_url_name_index()
+        for url_name in sorted(analysis.url_names):
+            problem = url_name_index.check_name(url_name)
+            if problem is not None:
+                problems.append(f'{{% url "{url_name}" %}}: {problem}')
+
+        return problems
+
+
+def should_check(analysis):
+    return not template_is_ignored(analysis.origin_name) and is_template_origin_from_project(analysis.origin_name)
+
+
+def check_templates(jobs=None):
+    """
+    Analyze every template from get_all_templates(), and return the
+    analyses of the project templates, each with a list of its problems.
+    """
+    names = get_all_templates() or []
+    checker = TemplateChecker(analyze_templates(names, jobs=jobs), names)
+
+    result = []
+    seen_origins = set()
+    for name in names:
+        analysis = checker.analyses.get(name)
+        # the same file can be found under several names, like templates/foo.html and foo.html
+        if analysis is None or analysis.origin_name in seen_origins or not should_check(analysis):
+            continue
+        seen_origins.add(analysis.origin_name)
+        result.append((analysis, checker.check(analysis)))
+    return result
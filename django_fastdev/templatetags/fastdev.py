@@ -5,9 +5,16 @@ from django.template import (
     NodeList,
     TemplateSyntaxError,
 )
-from django.template.defaulttags import TemplateIfParser
+from django.template.defaulttags import (
+    TemplateIfParser,
+    TemplateLiteral,
+)
 
-from django_fastdev.apps import FastDevVariableDoesNotExist
+from django_fastdev.apps import (
+    FastDevVariableDoesNotExist,
+    MISSING,
+    resolve_or_missing,
+)
 
 register = template.Library()
 
@@ -31,14 +38,16 @@ class IfExistsNode(Node):
     def render(self, context):
         for condition, nodelist in self.conditions_nodelists:
 
-            if condition is not None:           # ifexists / elifexists clause
+            if condition is None:               # else clause
+                match = True
+            elif isinstance(condition, TemplateLiteral):  # ifexists / elifexists on a single variable
+                match = resolve_or_missing(condition.value, context) is not MISSING
+            else:                               # ifexists / elifexists on an expression
                 try:
                     condition.eval(context)
                     match = True
                 except FastDevVariableDoesNotExist:
                     match = False
-            else:                               # else clause
-                match = True
 
             if match:
                 return nodelist.render(context)
@@ -1,5 +1,13 @@
+from django.template import (
+    Context,
+    Template,
+)
 from django.test import RequestFactory
 
 
 def req(method, **data):
     return getattr(RequestFactory(HTTP_REFERER='/'), method.lower())('/', data=data)
+
+
+def render(source, **context):
+    return Template(source).render(Context(context))
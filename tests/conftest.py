@@ -0,0 +1,13 @@
+import pytest
+
+from tests.models import (
+    BaseModel,
+    ModelWithValidFK,
+)
+
+
+@pytest.fixture
+def objects():
+    for i in range(3):
+        base_model = BaseModel.objects.create(name=f'base{i}')
+        ModelWithValidFK.objects.create(name=f'fk{i}', base_model=base_model)
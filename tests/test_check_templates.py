@@ -0,0 +1,110 @@
+from io import StringIO
+
+import pytest
+from django.core.management import (
+    CommandError,
+    call_command,
+)
+
+from django_fastdev import template_analysis
+from django_fastdev.template_analysis import (
+    analyze_template,
+    check_templates,
+)
+
+
+@pytest.fixture
+def template_dir(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+    settings.TEMPLATES = [{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [str(tmp_path)],
+    }]
+
+    def write(templates):
+        for name, source in templates.items():
+            (tmp_path / name).write_text(source)
+
+    return write
+
+
+def get_problems(results):
+    return {analysis.name: problems for analysis, problems in results}
+
+
+def test_analyze_template():
+    analysis = analyze_template('test_template_parser_bad_blocks.html')
+
+    assert analysis.extends == 'test_template_parser_throwing_bad_blocks_base.html'
+    assert analysis.overridden_blocks == {'content', 'doesnotexist'}
+    assert analysis.thrown_away_text == ['This gets thrown away silently by django']
+
+    assert analyze_template('test_ifexists.html').variables == {'a', 'b', 'c'}
+    assert analyze_template('does_not_exist.html') is None
+
+
+def test_check_templates_command():
+    out = StringIO()
+    with pytest.raises(CommandError) as e:
+        call_command('fastdev_check_templates', stdout=out)
+
+    assert str(e.value) == 'Found 3 problems in 13 templates'
+    output = out.getvalue()
+    assert 'templates/test_template_parser_bad_blocks.html' in output
+    assert 'Invalid blocks specified:\n\n        doesnotexist\n' in output
+    assert 'templates/test_template_parser_throws_away_html.html' in output
+    # FASTDEV_IGNORED_TEMPLATES
+    assert 'ignored' not in output
+
+
+def test_check_templates_references(template_dir):
+    template_dir({
+        'base.html': '{% block content %}{% endblock %}',
+        'page.html': '{% extends "base.html" %}{% block content %}{% include "snippet.html" %}{% endblock %}',
+        'missing_parent.html': '{% extends "bsae.html" %}',
+        'missing_include.html': '{% include "snippet.htm" %}{% include var %}',
+        'dynamic.html': '{% extends var %}{% block anything %}{% endblock %}',
+        'extends_dynamic.html': '{% extends "dynamic.html" %}{% block anything_else %}{% endblock %}',
+        'broken.html': '{% block content %}',
+        'extends_broken.html': '{% extends "broken.html" %}',
+        'loop_a.html': '{% extends "loop_b.html" %}',
+        'loop_b.html': '{% extends "loop_a.html" %}',
+        'snippet.html': '{{ a.b|default:c }}',
+        'links.html': '{% url "artist-view" %}{% url "artist-veiw" %}{% url "modul:artist-view2" as url %}',
+    })
+
+    problems = get_problems(check_templates(jobs=1))
+
+    assert problems['base.html'] == []
+    assert problems['page.html'] == []
+    assert problems['missing_parent.html'][0].startswith('extends "bsae.html", which does not exist\n\nDid you mean?\n\n    base.html\n')
+    assert problems['missing_include.html'] == ['includes "snippet.htm", which does not exist\n\nDid you mean?\n\n    snippet.html']
+    assert problems['dynamic.html'] == []
+    # the valid blocks can't be known when the chain has a dynamic extends
+    assert problems['extends_dynamic.html'] == []
+    assert problems['broken.html'][0].startswith('TemplateSyntaxError: ')
+    assert problems['extends_broken.html'][0].startswith('extends "broken.html", which does not compile: TemplateSyntaxError')
+    assert problems['loop_a.html'] == ['extends "loop_b.html", which extends this template again']
+    assert problems['links.html'] == ['{% url "artist-veiw" %}: \'artist-veiw\' is not a valid URL name\n\nDid you mean?\n\n    artist-view\n    module:artist-view2']
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'spawn'])
+def test_check_templates_in_parallel(template_dir, monkeypatch, start_method):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    if start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f'{start_method} is not available on this platform')
+
+    monkeypatch.setattr(template_analysis, 'PARALLEL_THRESHOLD', 0)
+    monkeypatch.setattr(template_analysis, 'ProcessPoolExecutor', partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context(start_method)))
+    template_dir({
+        'base.html': '{% block content %}{% endblock %}',
+        'page.html': '{% extends "base.html" %}{% block contnet %}{% endblock %}',
+    })
+
+    results = check_templates(jobs=2)
+
+    assert get_problems(results) == get_problems(check_templates(jobs=1))
+    assert get_problems(results)['page.html'][0].startswith('Invalid blocks specified:\n\n    contnet\n')
@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.template import (
+    Context,
+    Template,
+)
+
+from django_fastdev.apps import (
+    FastDevVariableDoesNotExist,
+    ignore_template_errors,
+)
+
+template = Template('{{ does_not_exist }}')
+
+
+def render(ignore):
+    try:
+        if ignore:
+            with ignore_template_errors():
+                return template.render(Context())
+        return template.render(Context())
+    except FastDevVariableDoesNotExist:
+        return 'raised'
+
+
+def test_ignore_template_errors_is_nestable():
+    with pytest.warns(DeprecationWarning):
+        with ignore_template_errors(deprecation_warning='outer'):
+            with ignore_template_errors():
+                assert template.render(Context()) == 'None'
+            # the outer block is still in effect, warning and all
+            assert template.render(Context()) == 'None'
+
+    with pytest.raises(FastDevVariableDoesNotExist):
+        template.render(Context())
+
+
+def test_ignore_template_errors_in_threads():
+    ignores = [i % 2 == 0 for i in range(400)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(render, ignores))
+
+    assert results == ['None' if ignore else 'raised' for ignore in ignores]
+
+
+def test_ignore_template_errors_in_asyncio_tasks():
+    async def task(ignore):
+        results = []
+        for _ in range(20):
+            if ignore:
+                with ignore_template_errors():
+                    await asyncio.sleep(0)  # let the other tasks run inside our block
+                    results.append(render(False))
+            else:
+                await asyncio.sleep(0)
+                results.append(render(False))
+        return results
+
+    async def main():
+        return await asyncio.gather(*[task(i % 2 == 0) for i in range(20)])
+
+    for i, results in enumerate(asyncio.run(main())):
+        assert results == ['None' if i % 2 == 0 else 'raised'] * 20
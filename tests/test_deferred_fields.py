@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+
+from django_fastdev.queries import DeferredFieldAccess
+from tests import render
+from tests.models import ModelWithValidFK
+
+
+@pytest.mark.django_db
+def test_deferred_field_access(settings, objects):
+    template = '{% for x in objects %}\n{{ x.name }}{{ x.base_model_id }}{% endfor %}'
+    assert render(template, objects=ModelWithValidFK.objects.only('name')) == '\nfk0base0\nfk1base1\nfk2base2'
+
+    settings.FASTDEV_DEFERRED_FIELDS = 'raise'
+    with pytest.raises(DeferredFieldAccess) as e:
+        render(template, objects=ModelWithValidFK.objects.only('name'))
+
+    assert str(e.value) == '''Deferred fields loaded while rendering:
+
+<unknown source>: ModelWithValidFK.base_model_id is deferred, and was loaded 3 times, first by {{ x.base_model_id }} on line 2. Remove it from .only()/.defer() in the view, or stop using it in the template.'''
+
+    assert render(template, objects=ModelWithValidFK.objects.all()) == '\nfk0base0\nfk1base1\nfk2base2'
+
+
+@pytest.mark.django_db
+def test_deferred_field_access_outside_of_templates(settings, objects):
+    settings.FASTDEV_DEFERRED_FIELDS = 'raise'
+
+    assert [x.base_model_id for x in ModelWithValidFK.objects.only('name')] == ['base0', 'base1', 'base2']
+    render('{% for x in objects %}{{ x.name }}{% endfor %}', objects=ModelWithValidFK.objects.only('name'))
+
+    with pytest.raises(DeferredFieldAccess) as e:
+        render('{{ x.base_model_id }}', x=ModelWithValidFK.objects.only('name').first())
+
+    assert 'ModelWithValidFK.base_model_id is deferred, and was loaded once, first by {{ x.base_model_id }} on line 1.' in str(e.value)
+
+
+@pytest.mark.django_db
+def test_deferred_field_access_warning(settings, objects, caplog):
+    settings.FASTDEV_DEFERRED_FIELDS = 'warn'
+
+    with caplog.at_level(logging.WARNING, logger='django_fastdev'):
+        render('{% for x in objects %}{{ x.base_model_id }}{% endfor %}', objects=ModelWithValidFK.objects.defer('base_model'))
+
+    assert 'ModelWithValidFK.base_model_id is deferred, and was loaded 3 times' in caplog.text
+
+
+@pytest.mark.django_db
+def test_deferred_fields_without_n_plus_one_feature(settings, objects):
+    from django_fastdev.apps import (
+        install_feature,
+        uninstall_feature,
+    )
+
+    settings.FASTDEV_N_PLUS_ONE_QUERIES = 'raise'
+    settings.FASTDEV_DEFERRED_FIELDS = 'raise'
+    uninstall_feature('n_plus_one_queries')
+    try:
+        with pytest.raises(DeferredFieldAccess):
+            render('{% for x in objects %}{{ x.base_model.name }}{% endfor %}', objects=ModelWithValidFK.objects.only('name'))
+    finally:
+        install_feature('n_plus_one_queries')
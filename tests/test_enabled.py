@@ -0,0 +1,29 @@
+import subprocess
+import sys
+from pathlib import Path
+
+CHECK_NO_PATCHES = '''
+import django
+from django.conf import settings
+from django.db.models import QuerySet
+from django.forms import Form
+from django.template.base import FilterExpression, Template
+from django.template.defaulttags import IfNode
+from django.template.loader_tags import ExtendsNode
+
+originals = [FilterExpression.resolve, Template.__init__, IfNode.render, ExtendsNode.render, Form.full_clean, QuerySet.get]
+
+settings.configure(
+    INSTALLED_APPS=['django_fastdev'],
+    TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+    FASTDEV_ENABLED=False,
+)
+django.setup()
+
+assert originals == [FilterExpression.resolve, Template.__init__, IfNode.render, ExtendsNode.render, Form.full_clean, QuerySet.get]
+assert Template('{{ does_not_exist }}').render(django.template.Context()) == ''
+'''
+
+
+def test_disabled_installs_no_patches():
+    subprocess.run([sys.executable, '-c', CHECK_NO_PATCHES], cwd=Path(__file__).parent.parent, check=True)
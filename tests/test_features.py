@@ -0,0 +1,71 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from django.template import (
+    Context,
+    Template,
+)
+
+from django_fastdev.apps import (
+    features,
+    get_enabled_features,
+    install_feature,
+    uninstall_feature,
+)
+
+
+@pytest.mark.django_db
+def test_uninstall_and_install_feature():
+    patched_get = QuerySet.get
+
+    uninstall_feature('queryset_get_errors')
+    try:
+        assert QuerySet.get is not patched_get
+        assert not features['queryset_get_errors'].installed
+        with pytest.raises(User.DoesNotExist) as e:
+            User.objects.get(username='a')
+        assert str(e.value) == 'User matching query does not exist.'
+    finally:
+        install_feature('queryset_get_errors')
+
+    assert features['queryset_get_errors'].installed
+    with pytest.raises(User.DoesNotExist) as e:
+        User.objects.get(username='a')
+    assert 'Query kwargs' in str(e.value)
+
+
+def test_uninstall_inherited_attribute():
+    uninstall_feature('template_does_not_exist_errors')
+    try:
+        from django.template import TemplateDoesNotExist
+        assert '__str__' not in vars(TemplateDoesNotExist)
+    finally:
+        install_feature('template_does_not_exist_errors')
+
+
+def test_uninstall_template_variables():
+    uninstall_feature('template_variables')
+    try:
+        assert Template('{{ does_not_exist }}').render(Context()) == ''
+    finally:
+        install_feature('template_variables')
+
+
+def test_enabled_features(settings):
+    assert len(get_enabled_features()) == len(features)
+
+    settings.FASTDEV_FEATURES = {'template_variables': False}
+    assert features['template_variables'] not in get_enabled_features()
+
+    settings.FASTDEV_FEATURES = {'template_varaibles': False}
+    with pytest.raises(ImproperlyConfigured):
+        get_enabled_features()
+
+
+def test_ifexists_without_template_variables():
+    uninstall_feature('template_variables')
+    try:
+        assert Template('{% load fastdev %}{% ifexists does_not_exist %}yes{% endifexists %}').render(Context()) == 'yes'
+    finally:
+        install_feature('template_variables')
@@ -76,3 +76,75 @@ def test_ignored_form_works(settings):
 
     IgnoredForm = fastdev_ignore(IgnoredForm)
     IgnoredForm().errors
+
+
+def test_is_from_project_is_cached_per_class():
+    import gc
+    import weakref
+    from django_fastdev.apps import _is_from_project_cache, is_from_project
+    from .forms import IgnoredForm
+
+    assert is_from_project(IgnoredForm)
+    assert IgnoredForm in _is_from_project_cache
+
+    class DynamicForm(Form):
+        pass
+
+    is_from_project(DynamicForm)
+    assert DynamicForm in _is_from_project_cache
+
+    ref = weakref.ref(DynamicForm)
+    del DynamicForm
+    gc.collect()
+    assert ref() is None
+
+
+# noinspection PyStatementEffect
+def test_clean_methods_are_collected_once_per_class(settings):
+    from django_fastdev.apps import get_clean_methods
+
+    class MyForm(Form):
+        field = CharField()
+        other = CharField()
+
+        def clean_field(self):
+            pass
+
+        def clean_other(self):
+            pass
+
+    clean_methods = get_clean_methods(MyForm)
+    assert clean_methods.names == ['clean_field', 'clean_other']
+    assert clean_methods.invalid_for_base_fields == []
+    assert get_clean_methods(MyForm) is clean_methods
+
+    settings.DEBUG = True
+    settings.FASTDEV_STRICT_FORM_CHECKING = True
+    MyForm().errors
+
+    form = MyForm()
+    del form.fields['other']
+    with pytest.raises(InvalidCleanMethod) as e:
+        form.errors
+
+    assert str(e.value) == """Clean method clean_other of class MyForm won't apply to any field. Available fields:\n\n    field"""
+
+
+# noinspection PyStatementEffect
+def test_clean_methods_assigned_on_the_instance(settings):
+    settings.DEBUG = True
+    settings.FASTDEV_STRICT_FORM_CHECKING = True
+
+    class MyForm(Form):
+        field = CharField()
+
+    form = MyForm(data={'field': 'x'})
+    form.clean_field = lambda: 'y'
+    assert form.is_valid()
+
+    form = MyForm(data={'field': 'x'})
+    form.clean_doesnotexist = lambda: None
+    with pytest.raises(InvalidCleanMethod) as e:
+        form.errors
+
+    assert str(e.value) == """Clean method clean_doesnotexist of class MyForm won't apply to any field. Available fields:\n\n    field"""
@@ -2,7 +2,7 @@ import subprocess
 import pytest
 from pathlib import Path
 import sys
-from django_fastdev.apps import FastDevVariableDoesNotExist, check_for_migrations_in_gitignore, check_for_pycache_in_gitignore, is_venv_ignored
+from django_fastdev.apps import FastDevVariableDoesNotExist, check_for_migrations_in_gitignore, check_for_pycache_in_gitignore, clear_path_caches, get_path_for_django_project, get_venv_path, is_venv_ignored
 
 def test_if_gitignore_has_migrations():
     line = 'migrations/'
@@ -53,3 +53,21 @@ def test_if_pycache_is_ignored_or_not():
     line = ''
     errors = check_for_pycache_in_gitignore(line)
     assert errors == False
+
+
+def test_project_path_is_cached_until_settings_change(settings, tmp_path: Path):
+    assert get_path_for_django_project() is get_path_for_django_project()
+
+    settings.BASE_DIR = tmp_path
+    assert get_path_for_django_project() == tmp_path.resolve()
+
+
+def test_venv_path_cache_is_cleared(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('VIRTUAL_ENV', str(tmp_path))
+    clear_path_caches()
+    try:
+        assert get_venv_path() == str(tmp_path)
+        monkeypatch.delenv('VIRTUAL_ENV')
+        assert get_venv_path() == str(tmp_path)
+    finally:
+        clear_path_caches()
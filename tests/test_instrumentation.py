@@ -0,0 +1,76 @@
+import logging
+from io import StringIO
+
+from django.core.management import call_command
+from django.template.base import FilterExpression
+from django.test import (
+    Client,
+    override_settings,
+)
+
+from django_fastdev.apps import features
+from django_fastdev.instrumentation import (
+    Stats,
+    collect_stats,
+    totals,
+)
+
+
+def reinstall():
+    for feature in features.values():
+        if feature.installed and feature.originals:
+            feature.uninstall()
+            feature.install()
+
+
+def test_not_instrumented_by_default():
+    assert not hasattr(FilterExpression.resolve, '__wrapped__')
+
+
+def test_collect_stats():
+    with override_settings(FASTDEV_INSTRUMENTATION=True):
+        reinstall()
+    try:
+        before = totals.calls['resolve_override']
+        with collect_stats() as stats:
+            Client().get('/template/')
+        assert stats.calls['resolve_override'] == 1
+        assert stats.seconds['resolve_override'] > 0
+        assert totals.calls['resolve_override'] == before + 1
+    finally:
+        reinstall()
+
+    assert not hasattr(FilterExpression.resolve, '__wrapped__')
+
+
+def test_middleware(caplog):
+    with override_settings(FASTDEV_INSTRUMENTATION=True):
+        reinstall()
+    try:
+        with override_settings(MIDDLEWARE=['django_fastdev.instrumentation.InstrumentationMiddleware']):
+            with caplog.at_level(logging.INFO, logger='django_fastdev'):
+                Client().get('/template/')
+    finally:
+        reinstall()
+
+    assert 'django-fastdev time for GET /template/:\n    resolve_override ' in caplog.text
+
+
+def test_stats_format():
+    stats = Stats()
+    assert stats.format() == '    (no calls)'
+    stats.add('a', 0.001)
+    stats.add('a', 0.001)
+    stats.add('bb', 0.01)
+    assert stats.format() == '    bb         1 calls       10.00 ms\n    a          2 calls        2.00 ms'
+
+
+def test_fastdev_overhead_command():
+    out = StringIO()
+    call_command('fastdev_overhead', '/template/', repeat=2, stdout=out)
+
+    output = out.getvalue()
+    assert output.startswith('/template/ (status 200, 2 requests)\n')
+    assert 'resolve_override' in output
+    assert 'overhead:' in output
+    assert not hasattr(FilterExpression.resolve, '__wrapped__')
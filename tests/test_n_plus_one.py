@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+
+from django_fastdev.queries import NPlusOneQueries
+from tests import render
+from tests.models import (
+    BaseModel,
+    ModelWithValidFK,
+)
+
+
+@pytest.mark.django_db
+def test_n_plus_one_is_off_by_default(objects):
+    render('{% for x in objects %}{{ x.base_model.name }}{% endfor %}', objects=ModelWithValidFK.objects.all())
+
+
+@pytest.mark.django_db
+def test_n_plus_one_forward_relation(settings, objects):
+    settings.FASTDEV_N_PLUS_ONE_QUERIES = 'raise'
+
+    with pytest.raises(NPlusOneQueries) as e:
+        render('{% for x in objects %}\n{{ x.base_model.name }}{% endfor %}', objects=ModelWithValidFK.objects.all())
+
+    message = str(e.value)
+    assert message.startswith('N+1 queries while rendering:\n\n{{ x.base_model.name }} in <unknown source>, line 2, ran the same query 3 times inside {% for x in objects %}:\n\n    SELECT ')
+    assert message.endswith("Use .select_related('base_model') on the queryset of {% for x in objects %}.")
+
+    assert render('{% for x in objects %}{{ x.base_model.name }}{% endfor %}', objects=ModelWithValidFK.objects.select_related('base_model')) == 'base0base1base2'
+
+
+@pytest.mark.django_db
+def test_n_plus_one_reverse_relation(settings, objects):
+    settings.FASTDEV_N_PLUS_ONE_QUERIES = True
+
+    with pytest.raises(NPlusOneQueries) as e:
+        render('{% for b in bases %}{% for x in b.modelwithvalidfk_set.all %}{{ x.name }}{% endfor %}{% endfor %}', bases=BaseModel.objects.all())
+
+    assert "{% for x in b.modelwithvalidfk_set.all %} in <unknown source>, line 1, ran the same query 3 times inside {% for b in bases %}" in str(e.value)
+    assert str(e.value).endswith("Use .prefetch_related('modelwithvalidfk_set') on the queryset of {% for b in bases %}.")
+
+    with pytest.raises(NPlusOneQueries) as e:
+        render('{% for b in bases %}{{ b.modelwithvalidfk_set.count }}{% endfor %}', bases=BaseModel.objects.all())
+
+    assert str(e.value).endswith("Use .prefetch_related('modelwithvalidfk_set') on the queryset of {% for b in bases %}.")
+
+    render('{% for b in bases %}{% for x in b.modelwithvalidfk_set.all %}{{ x.name }}{% endfor %}{% endfor %}', bases=BaseModel.objects.prefetch_related('modelwithvalidfk_set'))
+
+
+@pytest.mark.django_db
+def test_n_plus_one_threshold_and_warn(settings, objects, caplog):
+    settings.FASTDEV_N_PLUS_ONE_QUERIES = 'raise'
+    settings.FASTDEV_N_PLUS_ONE_THRESHOLD = 4
+    render('{% for x in objects %}{{ x.base_model.name }}{% endfor %}', objects=ModelWithValidFK.objects.all())
+
+    settings.FASTDEV_N_PLUS_ONE_QUERIES = 'warn'
+    settings.FASTDEV_N_PLUS_ONE_THRESHOLD = 3
+    with caplog.at_level(logging.WARNING, logger='django_fastdev'):
+        assert render('{% for x in objects %}{{ x.base_model.name }}{% endfor %}', objects=ModelWithValidFK.objects.all()) == 'base0base1base2'
+
+    assert "Use .select_related('base_model')" in caplog.text
+
+
+@pytest.mark.parametrize('setting', ['FASTDEV_N_PLUS_ONE_QUERIES', 'FASTDEV_DEFERRED_FIELDS'])
+def test_setting_installs_the_render_patch(settings, setting):
+    from django_fastdev.apps import Template as PatchedTemplate
+
+    orig_render = PatchedTemplate.render
+    setattr(settings, setting, 'warn')
+    assert PatchedTemplate.render is not orig_render
+
+    setattr(settings, setting, False)
+    assert PatchedTemplate.render is orig_render
@@ -69,3 +69,22 @@ def test_queryset_get_error_multi_self_ref():
 Query kwargs:
 
     selfref: <SelfRef pk=1>"""
+
+
+@pytest.mark.django_db
+def test_bounded_repr(settings, django_assert_num_queries):
+    from django_fastdev.apps import bounded_repr
+
+    with django_assert_num_queries(0):
+        assert bounded_repr(User.objects.all()) == '<QuerySet of User, not evaluated>'
+
+    User.objects.create(username='a')
+    users = User.objects.all()
+    list(users)
+    assert bounded_repr(users) == '<QuerySet [<User pk=1>]>'
+
+    assert bounded_repr(list(range(100))) == '[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, ...]'
+    assert bounded_repr({'b': {'a': [[[1]]]}}) == "{'b': {'a': [[[...]]]}}"
+
+    settings.FASTDEV_REPR_MAX_LENGTH = 10
+    assert bounded_repr('x' * 100) == "'xx...xxx'"
@@ -0,0 +1,157 @@
+import logging
+
+import pytest
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from django_fastdev.queries import (
+    RepeatedGetMiddleware,
+    RepeatedGetQueries,
+    RepeatedGetTracker,
+    track_repeated_gets,
+)
+
+
+@pytest.fixture
+def users():
+    return [User.objects.create(username=f'user{i}', first_name='first', email=f'user{i}@example.com') for i in range(10)]
+
+
+@pytest.mark.django_db
+def test_repeated_get(settings, users):
+    settings.FASTDEV_REPEATED_GET_QUERIES = 'raise'
+
+    with pytest.raises(RepeatedGetQueries) as e:
+        with track_repeated_gets():
+            for user in users:
+                User.objects.get(username=user.username)
+            for user in users[:5]:
+                User.objects.get(pk=user.pk)
+
+    assert str(e.value) == """Repeated QuerySet.get() calls in this block:
+
+User.objects.get(username=...) was called 10 times. Fetch them with one query, like User.objects.in_bulk(values, field_name='username')"""
+
+    settings.FASTDEV_REPEATED_GET_THRESHOLD = 5
+    with pytest.raises(RepeatedGetQueries) as e:
+        with track_repeated_gets():
+            for user in users[:5]:
+                User.objects.get(pk=user.pk)
+                User.objects.get(first_name='first', username=user.username)
+                User.objects.filter(first_name='first').get(email=user.email)
+
+    assert str(e.value).splitlines()[2:] == [
+        'User.objects.get(pk=...) was called 5 times. Fetch them with one query, like User.objects.in_bulk(ids)',
+        '',
+        'User.objects.get(first_name=..., username=...) was called 5 times. Fetch them with one query, like one User.objects.filter() for all of them, and a dict to look them up in',
+        '',
+        'User.objects.get(email=...) was called 5 times. Fetch them with one query, like User.objects.filter(email__in=values)',
+    ]
+
+
+@pytest.mark.django_db
+def test_repeated_get_not_tracked_outside_of_block(settings, users):
+    settings.FASTDEV_REPEATED_GET_QUERIES = 'raise'
+    for user in users:
+        User.objects.get(username=user.username)
+
+    settings.FASTDEV_REPEATED_GET_QUERIES = False
+    with track_repeated_gets() as tracker:
+        for user in users:
+            User.objects.get(username=user.username)
+    assert tracker is None
+
+
+@pytest.fixture
+def instrumented(request, settings):
+    from django_fastdev.apps import features
+
+    if not request.param:
+        yield
+        return
+
+    feature = features['queryset_get_errors']
+    settings.FASTDEV_INSTRUMENTATION = True
+    feature.uninstall()
+    feature.install()
+    yield
+    settings.FASTDEV_INSTRUMENTATION = False
+    feature.uninstall()
+    feature.install()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('instrumented', [False, True], indirect=True)
+def test_repeated_get_through_foreign_key(settings, instrumented):
+    from tests.models import (
+        BaseModel,
+        ModelWithValidFK,
+    )
+
+    settings.FASTDEV_REPEATED_GET_QUERIES = 'raise'
+    for i in range(10):
+        ModelWithValidFK.objects.create(name=f'fk{i}', base_model=BaseModel.objects.create(name=f'base{i}'))
+
+    with pytest.raises(RepeatedGetQueries) as e:
+        with track_repeated_gets():
+            for x in ModelWithValidFK.objects.all():
+                x.base_model
+
+    assert str(e.value) == """Repeated QuerySet.get() calls in this block:
+
+BaseModel objects were loaded through a relation 10 times, one query each. Load them along with the objects that refer to them, with select_related() or prefetch_related()"""
+
+    with track_repeated_gets():
+        for x in ModelWithValidFK.objects.select_related('base_model'):
+            x.base_model
+
+
+def test_repeated_get_tracker_is_bounded(monkeypatch):
+    monkeypatch.setattr(RepeatedGetTracker, 'max_shapes', 2)
+
+    tracker = RepeatedGetTracker()
+    for key in ['a', 'b', 'c', 'a', 'c']:
+        tracker.add(User, (), {key: 1})
+
+    assert tracker.counts == {(User, ('a',)): 2, (User, ('b',)): 1}
+
+
+@pytest.mark.django_db
+def test_repeated_get_middleware(users, caplog):
+    def view(request):
+        for user in users:
+            User.objects.get(username=user.username)
+        return HttpResponse()
+
+    with caplog.at_level(logging.WARNING, logger='django_fastdev'):
+        RepeatedGetMiddleware(view)(RequestFactory().get('/users/'))
+
+    assert 'Repeated QuerySet.get() calls in GET /users/:\n\nUser.objects.get(username=...) was called 10 times.' in caplog.text
+
+
+@pytest.mark.django_db
+def test_repeated_get_needs_queryset_get_errors_feature(settings, users, caplog):
+    from django.core.exceptions import MiddlewareNotUsed
+
+    from django_fastdev.apps import (
+        install_feature,
+        uninstall_feature,
+    )
+
+    settings.FASTDEV_REPEATED_GET_QUERIES = 'raise'
+    uninstall_feature('queryset_get_errors')
+    try:
+        with caplog.at_level(logging.WARNING, logger='django_fastdev'):
+            with track_repeated_gets() as tracker:
+                for user in users:
+                    User.objects.get(username=user.username)
+            assert tracker is None
+
+            with pytest.raises(MiddlewareNotUsed):
+                RepeatedGetMiddleware(lambda request: HttpResponse())
+    finally:
+        install_feature('queryset_get_errors')
+
+    assert 'QuerySet.get() calls are not tracked in this block: the queryset_get_errors feature of django-fastdev is turned off' in caplog.text
+    assert 'RepeatedGetMiddleware is not used: the queryset_get_errors feature of django-fastdev is turned off' in caplog.text
@@ -172,3 +172,92 @@ def test_debug_engine(settings):
 
 def test_ignored_templates():
     render(req('get'), template_name='ignored/test_resolve_simple.html')
+
+
+def test_technical_500_page_renders(settings):
+    import sys
+    from django.views.debug import technical_500_response
+
+    settings.FASTDEV_STRICT_IF = True
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        response = technical_500_response(req('get'), *sys.exc_info())
+
+    assert b'boom' in response.content
+
+
+def test_error_message_is_built_lazily():
+    from django.template import Template
+
+    reprs = []
+
+    class Foo:
+        def __repr__(self):
+            reprs.append(1)
+            return '<Foo>'
+
+    t = Template('{% load fastdev %}{% ifexists foo.does_not_exist %}yes{% else %}no{% endifexists %}')
+    assert t.render(Context(dict(foo=Foo()))) == 'no'
+    assert not reprs
+
+    t = Template('{{ foo.does_not_exist }}')
+    with pytest.raises(FastDevVariableDoesNotExist) as e:
+        t.render(Context(dict(foo=Foo())))
+    assert not reprs
+
+    assert 'The object was: <Foo>' in str(e.value)
+    assert reprs == [1]
+    str(e.value)
+    assert reprs == [1]
+
+
+def test_error_can_be_pickled():
+    import pickle
+    import threading
+    from django.template import Template
+
+    t = Template('{{ does_not_exist }}')
+    with pytest.raises(FastDevVariableDoesNotExist) as e:
+        t.render(Context(dict(lock=threading.Lock())))
+
+    unpickled = pickle.loads(pickle.dumps(e.value))
+    assert type(unpickled) is FastDevVariableDoesNotExist
+    assert str(unpickled) == str(e.value)
+    assert 'lock' in str(unpickled)
+
+
+def test_resolve_or_missing():
+    from django.template import Template
+    from django.template.base import FilterExpression, Parser
+    from django_fastdev.apps import MISSING, resolve_or_missing
+
+    context = Context(dict(a=dict(b=None)))
+    context.template = Template('')
+    parser = Parser([], builtins=context.template.engine.template_builtins)
+
+    assert resolve_or_missing(FilterExpression('a.b', parser), context) is None
+    assert resolve_or_missing(FilterExpression('a.c', parser), context) is MISSING
+    assert resolve_or_missing(FilterExpression('does_not_exist', parser), context) is MISSING
+    assert resolve_or_missing(FilterExpression('does_not_exist|default:"x"', parser), context) == 'x'
+
+
+def test_iter_context_keys():
+    from django_fastdev.apps import iter_context_keys
+
+    context = Context(dict(a=1, b=2))
+    context.push(b=3, c=4)
+
+    assert sorted(iter_context_keys(context)) == sorted(context.flatten().keys())
+    assert len(list(iter_context_keys(context))) == len(set(iter_context_keys(context)))
+
+
+def test_resolve_nested_context():
+    from django.template import Template
+
+    inner = Context(dict(a=1))
+    inner.push(b=2)
+    with pytest.raises(FastDevVariableDoesNotExist) as e:
+        Template('{{ inner.does_not_exist }}').render(Context(dict(inner=inner)))
+
+    assert 'Available keys:\n\n    False\n    None\n    True\n    a\n    b\n' in str(e.value)
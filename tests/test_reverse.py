@@ -1,9 +1,15 @@
 import pytest
-from django.urls import reverse
+from django.urls import (
+    NoReverseMatch,
+    clear_url_caches,
+    get_resolver,
+    reverse,
+)
 
 from django_fastdev.apps import (
     FastDevNoReverseMatch,
     FastDevNoReverseMatchNamespace,
+    get_url_name_index,
 )
 
 
@@ -41,3 +47,139 @@ def test_reverse_no_hit(settings):
 
     print(repr(e.value))
     assert str(e.value) == "Reverse for 'doesnotexist' not found. 'doesnotexist' is not a valid view function or pattern name.\n\nThese names exist:\n\n    artist-view2"
+
+
+def test_reverse_suggestions(settings):
+    settings.DEBUG = True
+    with pytest.raises(FastDevNoReverseMatch) as e:
+        reverse('artist-veiw')
+
+    assert str(e.value).endswith("Did you mean?\n\n    artist-view\n    module:artist-view2")
+
+    # names that only exist in a namespace
+    with pytest.raises(FastDevNoReverseMatch) as e:
+        reverse('artist-view2')
+
+    assert str(e.value).endswith("Did you mean?\n\n    module:artist-view2\n    artist-view")
+
+    with pytest.raises(FastDevNoReverseMatchNamespace) as e:
+        reverse('modul:artist-view2')
+
+    assert str(e.value).endswith("Available namespaces:\n    module\n\nDid you mean?\n\n    module")
+
+
+def test_no_reverse_match_can_be_pickled(settings):
+    import pickle
+
+    settings.DEBUG = True
+    for viewname, exception_class in [('module:doesnotexist', FastDevNoReverseMatch), ('doesnotexist:blabla', FastDevNoReverseMatchNamespace)]:
+        with pytest.raises(exception_class) as e:
+            reverse(viewname)
+
+        unpickled = pickle.loads(pickle.dumps(e.value))
+        assert type(unpickled) is exception_class
+        assert str(unpickled) == str(e.value)
+
+
+def test_url_name_index_is_cached_per_resolver(settings):
+    settings.DEBUG = True
+
+    index = get_url_name_index()
+    assert index.names == ['artist-view', 'module:artist-view2']
+    assert index.namespaces == ['module']
+    assert get_url_name_index() is index
+
+    clear_url_caches()
+    assert get_url_name_index() is not index
+
+
+def test_caught_no_reverse_match_does_not_build_the_message(settings):
+    from django_fastdev.apps import _url_name_indexes
+
+    settings.DEBUG = True
+    clear_url_caches()
+
+    with pytest.raises(NoReverseMatch) as e:
+        reverse('optional-link')
+    assert get_resolver() not in _url_name_indexes
+
+    assert 'These names exist' in str(e.value)
+    assert get_resolver() in _url_name_indexes
+
+
+def test_url_name_index_nested_and_application_namespaces():
+    from django.urls import (
+        URLResolver,
+        include,
+        path,
+    )
+    from django.urls.resolvers import (
+        RegexPattern,
+        get_ns_resolver,
+    )
+
+    from django_fastdev.apps import URLNameIndex
+
+    inner = ([path('detail/', lambda request: None, name='detail')], 'inner-app')
+    outer = ([path('inner/', include(inner, namespace='inner')), path('', lambda request: None, name='index')], 'outer-app')
+    resolver = URLResolver(RegexPattern(r'^/'), [path('outer/', include(outer, namespace='outer-instance'))])
+    index = URLNameIndex(resolver)
+
+    assert index.names == ['outer-instance:index', 'outer-instance:inner:detail']
+    assert index.namespaces == ['outer-instance', 'outer-instance:inner']
+    # the names listed when reversing fails inside a namespace
+    outer_resolver = resolver.namespace_dict['outer-instance'][1]
+    assert index.names_in(resolver) == []
+    assert index.names_in(outer_resolver) == ['index']
+    assert index.names_in(get_ns_resolver('outer/', outer_resolver, ())) == ['index']
+    assert index.check_name('outer-instance:inner:detail') is None
+    # the application namespace finds the default instance
+    assert index.check_name('outer-app:inner-app:detail') is None
+    assert index.check_name('outer-app:index') is None
+    assert index.check_name('outer-instance:inner:detial') == "'outer-instance:inner:detial' is not a valid URL name\n\nDid you mean?\n\n    outer-instance:inner:detail"
+    assert index.check_name('outer-instance:iner:detail').startswith("'outer-instance:iner' is not a registered namespace\n\nDid you mean?\n\n    outer-instance:inner")
+
+
+def test_url_names_are_checked_at_template_load(settings):
+    from django.template import (
+        Template,
+        TemplateSyntaxError,
+    )
+
+    reverse('artist-view')
+    Template('{% url "artist-veiw" %}')
+
+    settings.DEBUG = True
+    Template('{% url "artist-view" %}{% url "module:artist-view2" %}{% url name %}{% url "optional" as optional_url %}')
+
+    with pytest.raises(TemplateSyntaxError) as e:
+        Template('{% url "artist-veiw" %}')
+
+    assert str(e.value) == "Invalid {% url %}: 'artist-veiw' is not a valid URL name\n\nDid you mean?\n\n    artist-view\n    module:artist-view2"
+
+    with pytest.raises(TemplateSyntaxError) as e:
+        Template('{% url "modul:artist-view2" %}')
+
+    assert str(e.value).startswith("Invalid {% url %}: 'modul' is not a registered namespace\n\nDid you mean?\n\n    module")
+
+
+def test_url_names_are_not_checked_against_another_urlconf(settings, monkeypatch):
+    import sys
+    from types import ModuleType
+
+    from django.template import Template
+    from django.urls import set_urlconf
+
+    settings.DEBUG = True
+
+    # request.urlconf
+    set_urlconf('tests.urls')
+    try:
+        Template('{% url "artist-veiw" %}')
+    finally:
+        set_urlconf(None)
+
+    # the urlconf is still importing
+    monkeypatch.setitem(sys.modules, 'tests.importing_urls', ModuleType('tests.importing_urls'))
+    settings.ROOT_URLCONF = 'tests.importing_urls'
+    Template('{% url "artist-veiw" %}')
@@ -0,0 +1,20 @@
+from django_fastdev.suggestions import (
+    bounded_edit_distance,
+    get_close_matches,
+)
+
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance('kitten', 'sitting', 5) == 3
+    assert bounded_edit_distance('kitten', 'sitting', 2) == 3
+    assert bounded_edit_distance('a', 'abcdef', 2) == 3
+    assert bounded_edit_distance('same', 'same', 0) == 0
+
+
+def test_get_close_matches():
+    names = ['base.html', 'index.html', 'users/detail.html', 'users/list.html']
+    assert get_close_matches('user/detail.html', names) == ['users/detail.html']
+    assert get_close_matches('indx.html', names) == ['index.html']
+    assert get_close_matches('something else entirely', names) == []
+    assert get_close_matches('', names) == []
+    assert get_close_matches('base.html', []) == []
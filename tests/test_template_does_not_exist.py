@@ -0,0 +1,42 @@
+import pytest
+from django.template import (
+    TemplateDoesNotExist,
+    loader,
+)
+
+
+def test_template_does_not_exist_suggestions(settings):
+    settings.DEBUG = True
+
+    with pytest.raises(TemplateDoesNotExist) as e:
+        loader.get_template('test_resolve_simpel.html')
+
+    message = str(e.value)
+    assert message.startswith('test_resolve_simpel.html\n\nDid you mean?\n    test_resolve_simple.html')
+    assert '\nValid values:\n' in message
+    assert '    test_ifexists.html' in message
+    assert str(e.value) is message
+
+
+def test_template_catalog_picks_up_changes(tmp_path):
+    from django_fastdev.apps import get_template_files
+
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.html').write_text('')
+    (tmp_path / 'sub' / 'b.html').write_text('')
+    (tmp_path / 'sub' / 'ignored.py').write_text('')
+    assert sorted(get_template_files(str(tmp_path))) == ['a.html', 'sub/b.html']
+
+    (tmp_path / 'sub' / 'nested').mkdir()
+    (tmp_path / 'sub' / 'nested' / 'c.html').write_text('')
+    (tmp_path / 'a.html').unlink()
+    assert sorted(get_template_files(str(tmp_path))) == ['sub/b.html', 'sub/nested/c.html']
+
+
+def test_template_catalog_symlink_loop(tmp_path):
+    from django_fastdev.apps import get_template_files
+
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'a.html').write_text('')
+    (tmp_path / 'sub' / 'loop').symlink_to(tmp_path, target_is_directory=True)
+    assert sorted(get_template_files(str(tmp_path))) == ['sub/a.html']
@@ -1,5 +1,10 @@
 import pytest
-from django.template import loader
+from django.template import (
+    Context,
+    Engine,
+    Template,
+    loader,
+)
 
 
 def test_template_parser_bad_blocks(settings):
@@ -40,3 +45,106 @@ def test_template_parser_valid_cases(settings):
 
     loader.render_to_string('test_template_parser_throwing_bad_blocks_base_base.html')
     loader.render_to_string('test_template_parser_no_errors.html')
+
+
+def test_template_parser_valid_blocks_are_cached(settings):
+    from django_fastdev.apps import invalidate_valid_blocks
+
+    settings.DEBUG = True
+
+    loader.render_to_string('test_template_parser_no_errors.html')
+    parent = loader.get_template('test_template_parser_throwing_bad_blocks_base.html').template
+    generation, valid_blocks = parent._fastdev_valid_blocks
+    assert 'content2' in valid_blocks
+    assert 'footer-nested-in-for' in valid_blocks
+
+    loader.render_to_string('test_template_parser_no_errors.html')
+    assert parent._fastdev_valid_blocks[1] is valid_blocks
+
+    invalidate_valid_blocks()
+    loader.render_to_string('test_template_parser_no_errors.html')
+    assert parent._fastdev_valid_blocks[0] == generation + 1
+
+
+def test_template_parser_static_extends_is_validated_at_load(settings):
+    settings.DEBUG = True
+
+    with pytest.raises(Exception) as e:
+        loader.get_template('test_template_parser_bad_blocks.html')
+
+    assert str(e.value).startswith('Invalid blocks specified:')
+
+    with pytest.raises(AssertionError):
+        Template('{% extends "test_template_parser_throwing_bad_blocks_base.html" %}thrown away')
+
+
+def test_template_parser_dynamic_extends_is_validated_at_render(settings):
+    settings.DEBUG = True
+
+    t = Template('{% extends base %}{% block doesnotexist %}{% endblock %}')
+    with pytest.raises(Exception) as e:
+        t.render(Context({'base': 'test_template_parser_throwing_bad_blocks_base.html'}))
+
+    assert str(e.value).startswith('Invalid blocks specified:\n\n    doesnotexist')
+
+
+def test_template_parser_static_extends_of_dynamic_extends(settings):
+    settings.DEBUG = True
+
+    templates = {
+        'base.html': '{% block content %}{% endblock %}',
+        'mid.html': '{% extends base %}{% block content %}mid {% block inner %}{% endblock %}{% endblock %}',
+        'child.html': '{% extends "mid.html" %}{% block inner %}child{% endblock %}',
+        'bad_child.html': '{% extends "mid.html" %}{% block doesnotexist %}{% endblock %}',
+    }
+    engine = Engine(loaders=[('django.template.loaders.locmem.Loader', templates)], debug=True)
+
+    assert engine.get_template('child.html').render(Context({'base': 'base.html'})) == 'mid child'
+
+    # validated when rendering instead
+    t = engine.get_template('bad_child.html')
+    with pytest.raises(Exception) as e:
+        t.render(Context({'base': 'base.html'}))
+    assert str(e.value).startswith('Invalid blocks specified:\n\n    doesnotexist')
+
+
+def test_template_parser_dynamic_grandparent_is_validated_on_every_render(settings):
+    templates = {
+        'a.html': '{% block content %}{% endblock %}{% block a %}{% endblock %}',
+        'b.html': '{% block content %}{% endblock %}',
+        'mid.html': '{% extends base %}',
+        'child.html': '{% extends "mid.html" %}{% block a %}{% endblock %}',
+    }
+    engine = Engine(loaders=[('django.template.loaders.locmem.Loader', templates)], debug=True)
+    # compiled before DEBUG is turned on, so it's validated when rendering
+    t = engine.get_template('child.html')
+
+    settings.DEBUG = True
+    t.render(Context({'base': 'a.html'}))
+    with pytest.raises(Exception) as e:
+        t.render(Context({'base': 'b.html'}))
+    assert str(e.value).startswith('Invalid blocks specified:\n\n    a')
+
+
+def test_template_parser_uncached_loader_compiles_chain_once(settings, monkeypatch):
+    from django.template.loaders.locmem import Loader
+
+    settings.DEBUG = True
+
+    templates = {'level0.html': '{% block level0 %}{% endblock %}'}
+    for i in range(1, 6):
+        templates[f'level{i}.html'] = f'{{% extends "level{i - 1}.html" %}}{{% block level{i - 1} %}}{{% block level{i} %}}{{% endblock %}}{{% endblock %}}'
+    engine = Engine(loaders=[('django.template.loaders.locmem.Loader', templates)], debug=True)
+
+    loaded = []
+    orig_get_contents = Loader.get_contents
+
+    def get_contents(self, origin):
+        loaded.append(origin.name)
+        return orig_get_contents(self, origin)
+
+    monkeypatch.setattr(Loader, 'get_contents', get_contents)
+
+    engine.get_template('level5.html')
+    assert sorted(loaded) == [f'level{i}.html' for i in range(6)]
+
@@ -2,7 +2,10 @@ import pytest
 from django.template import Context, Template
 from django.template.loader import get_template
 from django.test import TestCase
-from django_fastdev.apps import FastDevVariableDoesNotExist
+from django_fastdev.apps import (
+    FastDevVariableDoesNotExist,
+    get_template_policy,
+)
 from unittest.mock import patch
 
 
@@ -65,3 +68,43 @@ def test_nonexistent_variable_with_multiple_filters2():
     template = Template('{{ nonexistent_var|default:"fallback"|upper }}')
     result = template.render(context)
     assert result == "FALLBACK", "Expected fallback value for None with multiple filters including default"
+
+
+def test_variable_is_resolved_once():
+    calls = []
+
+    class Foo:
+        @property
+        def bar(self):
+            calls.append(1)
+            return 'bar'
+
+    template = Template('{{ foo.bar|upper }}')
+    assert template.render(Context({"foo": Foo()})) == "BAR"
+    assert len(calls) == 1
+
+
+def test_template_policy_is_cached_per_template(settings):
+    template = Template('{{ existing_var }}')
+    template.render(context)
+
+    policy = get_template_policy(template)
+    assert policy is template._fastdev_policy
+    assert policy.check_variables
+    assert not policy.ignored
+    assert get_template_policy(template) is policy
+
+    settings.FASTDEV_STRICT_TEMPLATE_CHECKING = True
+    assert get_template_policy(template) is not policy
+
+
+def test_nonexistent_variable_suggestions():
+    template = Template("{{ existing_vr }}")
+    with pytest.raises(FastDevVariableDoesNotExist) as cm:
+        template.render(context)
+    assert str(cm.value).endswith("\nDid you mean?\n\n    existing_var\n")
+
+    template = Template("{{ obj.existing_feild }}")
+    with pytest.raises(FastDevVariableDoesNotExist) as cm:
+        template.render(Context({"obj": {"existing_field": "value"}}))
+    assert str(cm.value).endswith("\nDid you mean?\n\n    existing_field\n")
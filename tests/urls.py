@@ -1,3 +1,4 @@
+from django.shortcuts import render
 from django.urls import (
     include,
     path,
@@ -12,8 +13,13 @@ def artist_view(request):
     pass
 
 
+def template_view(request):
+    return render(request, 'test_resolve_fall_through.html', context=dict(a=dict(b=3)))
+
+
 urlpatterns = [
     path('', index_view),
     path('artist/', artist_view, name='artist-view'),
     path('module/', include('tests.module.urls')),
+    path('template/', template_view),
 ]